@@ -0,0 +1,35 @@
+"""add rooms expires_at index
+
+Revision ID: 7c3e5a9d2b41
+Revises: 18dad24bc36c
+Create Date: 2026-10-18 10:12:44.318027
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '7c3e5a9d2b41'
+down_revision: Union[str, Sequence[str], None] = '18dad24bc36c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Partial: rooms without an expiry are never reaped, so leave them out
+    op.create_index(
+        'ix_rooms_expires_at',
+        'rooms',
+        ['expires_at'],
+        unique=False,
+        postgresql_where=sa.text('expires_at IS NOT NULL'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_rooms_expires_at', table_name='rooms')
@@ -0,0 +1,73 @@
+"""
+Serve the app with uvicorn: `python -m app [uvicorn options]`.
+
+Same as `uvicorn app.main:app ...`, plus two things uvicorn's CLI can't
+be told from the app:
+
+- The first SIGTERM / SIGINT drains open sockets (RECONNECT hint, spread
+  over drain.window_seconds) before uvicorn stops serving. Plain uvicorn
+  closes every socket with 1012 before lifespan shutdown runs, so
+  without this only POST /drain (e.g. from a preStop hook) drains. A
+  second signal stops at once. Applies to a single server process, not
+  to --workers / --reload children.
+- uvicorn's own permessage-deflate is turned off while envelope
+  compression (websocket.compression) is on: those frames are already
+  deflated, and a second pass would only cost CPU and a zlib context
+  per socket. An explicit --ws-per-message-deflate or
+  UVICORN_WS_PER_MESSAGE_DEFLATE still wins.
+"""
+import asyncio
+import logging
+import os
+import sys
+
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+def _drain_on_exit_signal() -> None:
+    from uvicorn.server import Server
+
+    from app.services.drain_service import drain_in_progress, start_drain
+
+    handle_exit = Server.handle_exit
+
+    async def drain_then_exit(server: Server, sig: int) -> None:
+        try:
+            await start_drain(get_settings().drain)
+        except Exception:
+            logger.exception("Drain on shutdown failed")
+        finally:
+            handle_exit(server, sig, None)
+
+    def handle_exit_after_drain(server: Server, sig: int, frame) -> None:
+        # Runs in the main thread, which is also the event loop's
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+
+        if loop is None or server.should_exit or drain_in_progress() is not None:
+            handle_exit(server, sig, frame)
+            return
+
+        logger.info("Signal %d: draining before shutdown (signal again to stop now)", sig)
+        loop.call_soon_threadsafe(loop.create_task, drain_then_exit(server, sig))
+
+    Server.handle_exit = handle_exit_after_drain
+
+
+def main() -> None:
+    if get_settings().websocket.compression.enabled:
+        os.environ.setdefault("UVICORN_WS_PER_MESSAGE_DEFLATE", "false")
+
+    _drain_on_exit_signal()
+
+    from uvicorn.main import main as uvicorn_main
+
+    uvicorn_main(["app.main:app", *sys.argv[1:]])
+
+
+if __name__ == "__main__":
+    main()
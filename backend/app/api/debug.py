@@ -0,0 +1,28 @@
+import hmac
+
+from fastapi import APIRouter, Header, HTTPException, status
+
+from app.core.config import get_settings
+from app.state.loop_monitor import get_loop_monitor
+
+router = APIRouter(prefix="/debug", tags=["debug"])
+
+
+@router.get("/loop")
+async def loop_report(authorization: str | None = Header(default=None)):
+    """
+    Rolling event-loop lag percentiles and recent stalls with the stack
+    that was running when each was caught. 404 unless diagnostics are on
+    and an admin token is configured.
+    """
+    monitor = get_loop_monitor()
+    token = get_settings().diagnostics.admin_token
+
+    if monitor is None or token is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+
+    expected = f"Bearer {token}"
+    if authorization is None or not hmac.compare_digest(authorization, expected):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN)
+
+    return monitor.report()
@@ -0,0 +1,28 @@
+import hmac
+
+from fastapi import APIRouter, Header, HTTPException, status
+
+from app.core.config import get_settings
+from app.services.drain_service import start_drain
+
+router = APIRouter(prefix="/drain", tags=["drain"])
+
+
+@router.post("/", status_code=status.HTTP_202_ACCEPTED)
+async def drain(authorization: str | None = Header(default=None)):
+    """
+    Drain trigger, meant for a preStop hook before the process is stopped.
+    Flips /ready to 503, refuses new sockets and starts closing open ones.
+    """
+    settings = get_settings().drain
+
+    if settings.admin_token is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+
+    expected = f"Bearer {settings.admin_token}"
+    if authorization is None or not hmac.compare_digest(authorization, expected):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN)
+
+    start_drain(settings)
+
+    return {"status": "draining"}
@@ -0,0 +1,15 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.core.metrics import metrics
+
+router = APIRouter(prefix="/metrics", tags=["metrics"])
+
+
+@router.get("/", response_class=PlainTextResponse)
+async def scrape():
+    """
+    Prometheus text exposition of the process-wide metrics registry.
+    """
+    return PlainTextResponse(
+        metrics.expose(), media_type="text/plain; version=0.0.4; charset=utf-8")
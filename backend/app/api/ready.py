@@ -2,8 +2,8 @@ from fastapi import APIRouter, status
 from fastapi.responses import JSONResponse
 
 
-from app.core.db import check_database_connection
 from app.state.connections import connections
+from app.state.health import get_health_monitor
 
 router = APIRouter(prefix="/ready", tags=["ready"])
 
@@ -13,33 +13,33 @@ async def ready():
     """
     Readiness probe.
     Answers: can the app actually serve traffic?
+
+    Served from the health monitor's last snapshot; probes never touch
+    the database themselves.
     """
-    checks = {
-        "database": False,
-        "websocket": False,
-    }
-
-    # ---- DB check ----
-    try:
-        await check_database_connection()
-        checks["database"] = True
-    except Exception:
-        pass
-
-    # ---- WebSocket runtime check ----
-    # If the registry exists and is usable, WS stack is alive
-    try:
-        _ = connections.connections
-        checks["websocket"] = True
-    except Exception:
-        pass
-
-    all_ok = all(checks.values())
+    if connections.draining:
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"status": "draining"},
+        )
+
+    monitor = get_health_monitor()
+
+    if monitor is None or monitor.snapshot is None:
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"status": "starting"},
+        )
+
+    snapshot = monitor.snapshot
+    fresh = monitor.is_fresh()
+    all_ok = fresh and all(snapshot.checks.values())
 
     return JSONResponse(
         status_code=status.HTTP_200_OK if all_ok else status.HTTP_503_SERVICE_UNAVAILABLE,
         content={
             "status": "ready" if all_ok else "not_ready",
-            "checks": checks,
+            "checks": {**snapshot.checks, "fresh": fresh},
+            "details": snapshot.details,
         },
     )
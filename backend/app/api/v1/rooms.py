@@ -1,28 +1,85 @@
-from app.services.room_create_service import create_room
-from app.models.room import CreateRoomResponseSchema, CreateRoomSchema
-from fastapi import APIRouter, Depends, status, HTTPException, Query
-from app.core.db import get_db_session
-from sqlalchemy.ext.asyncio import AsyncSession
+import math
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 
+from app.core.config import get_settings
+from app.core.db import get_db_session
+from app.core.security import PasswordHasherBusyError
 from app.models.room import (
-    RoomJoinResponseSchema,
+    BulkCreateRoomsResponseSchema,
+    BulkCreateRoomsSchema,
+    CreateRoomResponseSchema,
+    CreateRoomSchema,
     RoomInfoSchema,
+    RoomJoinResponseSchema,
     RoomJoinTokenSchema,
-    JoinRoomSchema,
-)
-from app.services.room_join_service import join_room as join_room_service
-from app.services.room_join_service import (
-    RoomNotFoundError,
-    RoomExpiredError,
-    RoomPasswordError,
 )
+from app.state.rate_limiter import RateLimitedError, get_rate_limiter
+
+# The room services (and the ORM behind them) are imported inside the
+# endpoints, so building the app doesn't load SQLAlchemy; after the first
+# request each import is a sys.modules lookup.
 
 router = APIRouter(prefix="/rooms", tags=["rooms"])
 
 
+def _server_busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Server is busy, please retry shortly.",
+        headers={"Retry-After": "1"},
+    )
+
+
+async def _rate_limit(rule: str, key: str, cost: int = 1) -> None:
+    """
+    Reject over-limit callers before any DB query or Argon2 work.
+    """
+    limiter = get_rate_limiter()
+    if limiter is None:
+        return
+
+    try:
+        await limiter.check(rule, key, cost)
+    except RateLimitedError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many attempts, please slow down.",
+            headers={"Retry-After": str(math.ceil(exc.retry_after))},
+        )
+
+
+async def _refund(rule: str, key: str) -> None:
+    """
+    Give back the token an attempt took, once it turns out not to count.
+    """
+    limiter = get_rate_limiter()
+    if limiter is not None:
+        await limiter.refund(rule, key)
+
+
+def _client_ip(request: Request) -> str:
+    """
+    The caller's address. Behind a proxy (server.client_ip_header set) it
+    is read from the header, counting trusted_proxy_hops entries from the
+    right: entries further left are whatever the client chose to send.
+    """
+    settings = get_settings().server
+
+    if settings.client_ip_header is not None:
+        header = request.headers.get(settings.client_ip_header)
+        if header:
+            hops = [hop.strip() for hop in header.split(",")]
+            if len(hops) >= settings.trusted_proxy_hops:
+                return hops[-settings.trusted_proxy_hops]
+
+    return request.client.host if request.client else "unknown"
+
+
 @router.post("/create", response_model=CreateRoomResponseSchema)
 async def create_room_endpoint(
     room_data: CreateRoomSchema,
+    request: Request,
     db=Depends(get_db_session),
 ):
     """
@@ -36,28 +93,90 @@ async def create_room_endpoint(
     - room_code: Unique code for the created room
     """
 
-    room = await create_room(
-        db=db,
-        name=room_data.name,
-        password=room_data.password,
-        expires_at=room_data.expires_at,
-    )
+    from app.services.room_create_service import RoomCodeExhaustedError, create_room
+
+    await _rate_limit("create_per_ip", _client_ip(request))
+
+    try:
+        room = await create_room(
+            db=db,
+            name=room_data.name,
+            password=room_data.password,
+            expires_at=room_data.expires_at,
+        )
+
+    except (PasswordHasherBusyError, RoomCodeExhaustedError):
+        raise _server_busy()
 
     return CreateRoomResponseSchema(room_code=room.room_code)
 
 
+@router.post("/bulk-create", response_model=BulkCreateRoomsResponseSchema)
+async def bulk_create_rooms_endpoint(
+    body: BulkCreateRoomsSchema,
+    request: Request,
+    db=Depends(get_db_session),
+):
+    """
+    Create many rooms at once (events, classrooms).
+
+    All rooms are written in one transaction; the response lists their
+    codes in request order. Each room counts as one create against the
+    rate limit.
+    """
+
+    from app.services.room_create_service import RoomCodeExhaustedError, create_rooms
+
+    limit = get_settings().room_create.bulk_max_rooms
+    if len(body.rooms) > limit:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"At most {limit} rooms per request.",
+        )
+
+    await _rate_limit("create_per_ip", _client_ip(request), cost=len(body.rooms))
+
+    try:
+        rooms = await create_rooms(
+            db=db,
+            rooms=[(r.name, r.password, r.expires_at) for r in body.rooms],
+        )
+
+    except (PasswordHasherBusyError, RoomCodeExhaustedError):
+        raise _server_busy()
+
+    return BulkCreateRoomsResponseSchema(room_codes=[room.room_code for room in rooms])
+
+
 @router.post(
     "/join",
     response_model=RoomJoinResponseSchema,
     status_code=status.HTTP_200_OK,
 )
 async def join_room(
+    request: Request,
     room_code: str = Query(..., min_length=4, max_length=16,
                            description="Human-shareable room code"),
     password: str = Query(..., min_length=1,
                           description="Plaintext room password (verified server-side)"),
-    db: AsyncSession = Depends(get_db_session),
+    db=Depends(get_db_session),
 ):
+    from app.services.room_join_service import (
+        RoomExpiredError,
+        RoomNotFoundError,
+        RoomPasswordError,
+    )
+    from app.services.room_join_service import join_room as join_room_service
+
+    # Per IP stops one client spraying passwords; per room stops many
+    # clients guessing the same room's password together. The room's
+    # token is taken before Argon2 runs, so concurrent guesses all count,
+    # and given back unless the password was wrong: a room filling up is
+    # never throttled by its own successful joins.
+    await _rate_limit("join_per_ip", _client_ip(request))
+    await _rate_limit("join_per_room", room_code)
+    wrong_password = False
+
     try:
         room, token, token_expires_at = await join_room_service(
             db=db,
@@ -79,11 +198,19 @@ async def join_room(
         )
 
     except RoomPasswordError:
+        wrong_password = True
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Incorrect password.",
         )
 
+    except PasswordHasherBusyError:
+        raise _server_busy()
+
+    finally:
+        if not wrong_password:
+            await _refund("join_per_room", room_code)
+
     return RoomJoinResponseSchema(
         room=RoomInfoSchema(
             id=room.id,
@@ -0,0 +1,111 @@
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect, status
+
+from app.core.config import get_settings
+from app.core.metrics import metrics
+from app.core.protocol import (
+    HEADER_SIZE,
+    FrameError,
+    FrameType,
+    encode_frame,
+    validate_client_frame,
+    validate_client_text,
+)
+from app.services.join_token_service import validate_join_token
+from app.services.resume_token_service import validate_resume_token
+from app.state.connections import RoomFullError, connections
+from app.state.presence import clean_display_name
+
+router = APIRouter(tags=["websocket"])
+
+_ws_received = metrics.counter(
+    "wwi_ws_messages_received_total", "Messages received from WebSocket clients")
+
+
+@router.websocket("/ws")
+async def websocket_endpoint(
+    ws: WebSocket,
+    token: str | None = None,
+    resume: str | None = None,
+    name: str = "",
+    since: int | None = None,
+):
+    if connections.draining:
+        await ws.close(code=status.WS_1012_SERVICE_RESTART)
+        return
+
+    # Admission is a single in-memory lookup (or an HMAC check for resume
+    # tokens); the DB was already hit and the password verified when the
+    # original join token was issued.
+    if token is not None:
+        room_id = validate_join_token(token)
+    elif resume is not None:
+        room_id = validate_resume_token(resume)
+    else:
+        room_id = None
+
+    if room_id is None:
+        await ws.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    await ws.accept()
+
+    ws_settings = get_settings().websocket
+    max_name = ws_settings.max_display_name_chars
+
+    try:
+        connection = connections.register(ws, room_id, clean_display_name(name, max_name))
+    except RoomFullError:
+        await ws.close(code=status.WS_1013_TRY_AGAIN_LATER)
+        return
+
+    # Tell the client which sender slot to stamp on its binary frames
+    welcome = encode_frame(FrameType.WELCOME, connection.slot, room_id)
+    connection.enqueue({"type": "websocket.send", "bytes": welcome}, len(welcome))
+
+    # Catch a reconnecting client up; no await since register(), so no
+    # live frame can slip in ahead of the replay
+    if since is not None:
+        connections.replay(connection, since)
+
+    room_bytes = room_id.bytes
+    max_payload = ws_settings.max_payload_bytes
+
+    try:
+        while True:
+            message = await ws.receive()
+
+            if message["type"] == "websocket.disconnect":
+                break
+
+            _ws_received.inc()
+
+            frame = message.get("bytes")
+
+            if frame is not None:
+                # Only the header is checked; MESSAGE payloads are relayed untouched
+                header = validate_client_frame(
+                    frame,
+                    room_id=room_bytes,
+                    sender_slot=connection.slot,
+                    max_payload=max_payload,
+                )
+
+                if header.type == FrameType.RENAME:
+                    try:
+                        new_name = frame[HEADER_SIZE:].decode("utf-8")
+                    except UnicodeDecodeError:
+                        raise FrameError("Display name is not UTF-8")
+                    connections.rename(connection, clean_display_name(new_name, max_name))
+                    continue
+
+                connections.broadcast(room_id, frame, exclude=ws)
+            elif (text := message.get("text")) is not None:
+                validate_client_text(text, max_payload=max_payload)
+                connections.broadcast(room_id, text, exclude=ws)
+
+    except FrameError:
+        await ws.close(code=status.WS_1002_PROTOCOL_ERROR)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        connections.disconnect(ws)
@@ -0,0 +1,109 @@
+import zlib
+
+from app.core.protocol import (
+    FLAG_DEFLATE,
+    FLAG_DEFLATE_STREAM,
+    FLAG_SEQ,
+    HEADER,
+    HEADER_SIZE,
+    SEQUENCE,
+)
+
+_SYNC_TAIL = b"\x00\x00\xff\xff"
+# An empty final fixed-Huffman block: ends a raw DEFLATE stream
+_FINAL_BLOCK = b"\x03\x00"
+
+# One long-lived compressor per level for deflate_frame. A full flush
+# after each frame resets its history, so frames stay independent
+# without paying deflateInit per frame.
+_frame_compressors: dict[int, "zlib._Compress"] = {}
+
+
+def deflate_frame(frame: bytes, *, level: int, min_bytes: int) -> bytes:
+    """
+    Compress one envelope's payload, independently of any other frame.
+
+    Returns the frame unchanged if it is too small, already flagged, or
+    would not get smaller.
+    """
+    frame_type, flags, slot, room_id, length = HEADER.unpack_from(frame)
+
+    if flags or length < min_bytes:
+        return frame
+
+    compressor = _frame_compressors.get(level)
+    if compressor is None:
+        compressor = _frame_compressors[level] = zlib.compressobj(
+            level, zlib.DEFLATED, -zlib.MAX_WBITS)
+
+    payload = memoryview(frame)[HEADER_SIZE:]
+    compressed = (
+        compressor.compress(payload)
+        + compressor.flush(zlib.Z_FULL_FLUSH)
+        + _FINAL_BLOCK
+    )
+
+    if len(compressed) >= length:
+        return frame
+
+    return HEADER.pack(frame_type, FLAG_DEFLATE, slot, room_id, len(compressed)) + compressed
+
+
+def context_memory(window_bits: int, mem_level: int) -> int:
+    """
+    zlib's documented deflate memory use for these parameters.
+    """
+    return (1 << (window_bits + 2)) + (1 << (mem_level + 9))
+
+
+class StreamDeflater:
+    """
+    Per-connection deflate context with context takeover.
+
+    Each compressed payload is sync-flushed so the client can inflate it
+    as soon as it arrives, using one inflate stream for the connection.
+    """
+
+    __slots__ = ("_compressor", "_min_bytes", "memory")
+
+    def __init__(self, *, level: int, window_bits: int, mem_level: int, min_bytes: int) -> None:
+        self._compressor = zlib.compressobj(
+            level, zlib.DEFLATED, -window_bits, mem_level)
+        # Never an empty body: it would inflate to nothing, which a client
+        # reading the stream cannot tell apart from "not yet"
+        self._min_bytes = max(min_bytes, 1)
+        self.memory = context_memory(window_bits, mem_level)
+
+    def deflate_frames(self, data: bytes) -> bytes:
+        """
+        Compress every eligible envelope in a (possibly coalesced) frame.
+        """
+        parts: list[bytes] = []
+        view = memoryview(data)
+        offset = 0
+        changed = False
+
+        while offset < len(data):
+            frame_type, flags, slot, room_id, length = HEADER.unpack_from(data, offset)
+            end = offset + HEADER_SIZE + length
+            # A sequence prefix stays in the clear; only the rest is deflated
+            prefix = SEQUENCE.size if flags & FLAG_SEQ else 0
+            body = offset + HEADER_SIZE + prefix
+
+            if flags & ~FLAG_SEQ or length - prefix < self._min_bytes:
+                parts.append(view[offset:end])
+            else:
+                compressed = self._compressor.compress(view[body:end])
+                compressed += self._compressor.flush(zlib.Z_SYNC_FLUSH)
+                compressed = compressed[:-len(_SYNC_TAIL)]
+
+                parts.append(HEADER.pack(
+                    frame_type, flags | FLAG_DEFLATE_STREAM, slot, room_id,
+                    prefix + len(compressed)))
+                parts.append(view[offset + HEADER_SIZE:body])
+                parts.append(compressed)
+                changed = True
+
+            offset = end
+
+        return b"".join(parts) if changed else data
@@ -1,4 +1,5 @@
 from functools import lru_cache
+from typing import Literal
 from pydantic import BaseModel, Field
 from pydantic_settings import BaseSettings
 
@@ -16,6 +17,11 @@ class AppSettings(BaseModel):
 class ServerSettings(BaseModel):
     host: str = Field(default="0.0.0.0")
     port: int = Field(default=8000)
+    # Behind a load balancer: header carrying the client address (e.g.
+    # "X-Forwarded-For"), and how many proxies append to it. Unset = use
+    # the peer address. Only set this if every request passes the proxy.
+    client_ip_header: str | None = Field(default=None)
+    trusted_proxy_hops: int = Field(default=1, ge=1)
 
 
 # ---------- Database ----------
@@ -30,6 +36,233 @@ class DatabaseSettings(BaseModel):
     pool_size: int = Field(default=5)
     echo: bool = Field(default=False)
 
+    # Extra connections allowed past pool_size under burst
+    max_overflow: int = Field(default=10, ge=0)
+    # How long a request waits for a free connection before failing
+    pool_timeout_seconds: float = Field(default=30.0, gt=0)
+    # Replace connections older than this (-1 = never)
+    pool_recycle_seconds: int = Field(default=1800, ge=-1)
+
+    # Liveness check on checkout. pre_ping costs a round trip on every
+    # checkout; idle validation only pings connections that sat in the
+    # pool longer than validate_idle_after_seconds.
+    validation: Literal["pre_ping", "idle", "none"] = Field(default="pre_ping")
+    validate_idle_after_seconds: float = Field(default=30.0, ge=0)
+
+    # asyncpg prepared-statement cache per connection (0 behind pgbouncer
+    # in transaction mode)
+    statement_cache_size: int = Field(default=100, ge=0)
+
+    # Separate pool for background jobs (reaper, health probes) so they
+    # can't take connections from user requests. 0 = share the main pool.
+    background_pool_size: int = Field(default=2, ge=0)
+    background_max_overflow: int = Field(default=0, ge=0)
+
+    # "blocking" holds startup until the database answers (and fails it if
+    # it doesn't); "background" starts serving at once and /ready stays 503
+    # until the health monitor has reached the database.
+    startup_check: Literal["blocking", "background"] = Field(default="background")
+
+
+# ---------- Security ----------
+
+class SecuritySettings(BaseModel):
+    # Threads dedicated to Argon2 hashing / verification
+    hash_workers: int = Field(default=4, ge=1)
+    # Extra jobs allowed to wait for a worker before rejecting with 503
+    hash_queue_depth: int = Field(default=64, ge=0)
+
+    # Argon2 cost profile. "calibrate" measures the host at startup and
+    # picks the time cost that reaches hash_target_verify_ms.
+    hash_profile: Literal["low_memory", "high_memory", "calibrate"] = Field(
+        default="low_memory")
+    # Explicit overrides applied on top of the profile
+    hash_time_cost: int | None = Field(default=None, ge=1)
+    hash_memory_cost: int | None = Field(default=None, ge=8, description="KiB")
+    hash_parallelism: int | None = Field(default=None, ge=1)
+    hash_target_verify_ms: float = Field(default=50.0, gt=0)
+
+
+# ---------- Room cache ----------
+
+class RoomCacheSettings(BaseModel):
+    enabled: bool = Field(default=True)
+    max_entries: int = Field(default=10_000, ge=1)
+    # How long a found room is served from memory
+    ttl_seconds: float = Field(default=60.0, gt=0)
+    # How long an unknown code is remembered; keep short so rooms created
+    # on another replica become visible quickly
+    negative_ttl_seconds: float = Field(default=5.0, ge=0)
+
+
+# ---------- Room creation ----------
+
+class RoomCreateSettings(BaseModel):
+    # Concurrent creates are collected for this long and written with one
+    # multi-row INSERT ... RETURNING and one commit. 0 disables batching.
+    batch_window_ms: float = Field(default=2.0, ge=0)
+    batch_max_rooms: int = Field(default=100, ge=1)
+    # Largest POST /api/rooms/bulk-create request
+    bulk_max_rooms: int = Field(default=100, ge=1)
+
+
+# ---------- Rate limiting ----------
+
+class RateLimitSettings(BaseModel):
+    enabled: bool = Field(default=True)
+    # Each rule: sustained requests per second, and how many may arrive at
+    # once. Join attempts are limited per client IP and, across all
+    # clients, wrong-password attempts per room code.
+    join_per_ip_rate: float = Field(default=1.0, gt=0)
+    join_per_ip_burst: int = Field(default=10, ge=1)
+    join_per_room_rate: float = Field(default=2.0, gt=0)
+    join_per_room_burst: int = Field(default=20, ge=1)
+    create_per_ip_rate: float = Field(default=0.2, gt=0)
+    create_per_ip_burst: int = Field(default=5, ge=1)
+    # In-process buckets: idle keys are evicted LRU past max_keys per rule
+    shards: int = Field(default=16, ge=1)
+    max_keys: int = Field(default=100_000, ge=1)
+    # "redis" shares buckets between replicas (requires the "redis" extra);
+    # the in-process buckets are used as a fallback if Redis is unreachable
+    backend: Literal["memory", "redis"] = Field(default="memory")
+    redis_url: str = Field(default="redis://localhost:6379/0")
+    key_prefix: str = Field(default="wwi:rl:")
+
+
+# ---------- Backplane ----------
+
+class BackplaneSettings(BaseModel):
+    # "memory" keeps fan-out inside this process; "redis" relays between
+    # processes over Redis pub/sub (requires the "redis" extra)
+    backend: Literal["memory", "redis"] = Field(default="memory")
+    redis_url: str = Field(default="redis://localhost:6379/0")
+    channel_prefix: str = Field(default="wwi:room:")
+    # Outgoing messages are grouped per room for this long before publishing
+    batch_interval_ms: float = Field(default=5.0, ge=0)
+    batch_max_messages: int = Field(default=256, ge=1)
+    # Sender slots (1..65535) are split into this many blocks; each live
+    # node leases one, so slots never collide across nodes. A room holds
+    # at most 65535 // max_nodes members per node.
+    max_nodes: int = Field(default=16, ge=1, le=256)
+
+
+# ---------- Reaper ----------
+
+class ReaperSettings(BaseModel):
+    enabled: bool = Field(default=True)
+    interval_seconds: float = Field(default=60.0, gt=0)
+    # Rows deleted per statement; keeps each transaction short
+    batch_size: int = Field(default=500, ge=1)
+
+
+# ---------- WebSocket ----------
+
+class CompressionSettings(BaseModel):
+    # Deflate binary frame payloads (envelope flag). `python -m app` then
+    # turns off uvicorn's permessage-deflate, which would only re-deflate
+    enabled: bool = Field(default=False)
+    min_bytes: int = Field(default=256, ge=0)
+    level: int = Field(default=6, ge=0, le=9)
+    # "shared": every frame compressed once, stateless, reused by all
+    # recipients. "per_connection": one deflate stream per socket with
+    # context takeover (better ratio, compressed once per recipient).
+    context: Literal["shared", "per_connection"] = Field(default="shared")
+    # per_connection only: window / memory level bound each context's size
+    window_bits: int = Field(default=12, ge=9, le=15)
+    mem_level: int = Field(default=5, ge=1, le=9)
+    # Total memory all per-connection contexts may use; sockets admitted
+    # beyond it are sent uncompressed
+    max_memory_bytes: int = Field(default=64 * 1024 * 1024, ge=0)
+
+
+class ReplaySettings(BaseModel):
+    # Keep recent MESSAGE frames per room in memory so a reconnecting
+    # client can resume from a sequence number. Enabling it stamps every
+    # MESSAGE frame with FLAG_SEQ, so clients must understand that flag.
+    enabled: bool = Field(default=False)
+    # Per-room limits; whichever is hit first drops the oldest frames
+    max_messages: int = Field(default=256, ge=1)
+    max_bytes: int = Field(default=256 * 1024, ge=1)
+    max_age_seconds: float = Field(default=120.0, gt=0)
+    # All rooms together; past it the least recently active rooms go first
+    max_total_bytes: int = Field(default=64 * 1024 * 1024, ge=1)
+
+
+class WebSocketSettings(BaseModel):
+    # Outbound buffer high-water marks per socket (frames / bytes)
+    send_queue_size: int = Field(default=256, ge=1)
+    send_queue_high_water_bytes: int = Field(default=1024 * 1024, ge=1)
+    # What to do once a socket crosses a high-water mark:
+    # disconnect it, drop its oldest frames, or merge queued binary frames
+    slow_consumer_policy: Literal["disconnect", "drop_oldest", "coalesce"] = Field(
+        default="disconnect")
+    # Optional write coalescing: binary frames for a room are held for up
+    # to this long (or until the byte budget fills) and sent as one frame
+    # per recipient. 0 disables it.
+    coalesce_window_ms: float = Field(default=0.0, ge=0)
+    coalesce_max_bytes: int = Field(default=64 * 1024, ge=1)
+    compression: CompressionSettings = Field(default_factory=CompressionSettings)
+    replay: ReplaySettings = Field(default_factory=ReplaySettings)
+    # Largest payload accepted from a client: binary frame payload, or a
+    # text message's UTF-8 size; larger ones close the socket with 1002
+    max_payload_bytes: int = Field(default=64 * 1024, ge=1)
+    # Roster changes are batched for this long before going out, so a burst
+    # of joins costs one delta per member instead of one per join
+    presence_batch_ms: float = Field(default=50.0, ge=0)
+    max_display_name_chars: int = Field(default=64, ge=1)
+
+
+# ---------- Health ----------
+
+class HealthSettings(BaseModel):
+    # Component checks run on this schedule; /ready serves the last result
+    interval_seconds: float = Field(default=5.0, gt=0)
+    db_timeout_seconds: float = Field(default=2.0, gt=0)
+    # A snapshot older than this is treated as not ready
+    stale_after_seconds: float = Field(default=15.0, gt=0)
+    # Not ready while the event loop falls further behind than this
+    max_loop_lag_ms: float = Field(default=250.0, gt=0)
+    # Not ready above this many local sockets (None = unlimited)
+    max_connections: int | None = Field(default=None, ge=1)
+    # Not ready once the Argon2 pool is this full (inflight / capacity)
+    max_hash_pool_saturation: float = Field(default=1.0, gt=0, le=1)
+
+
+# ---------- Drain ----------
+
+class DrainSettings(BaseModel):
+    # Open sockets are closed spread evenly over this window
+    window_seconds: float = Field(default=10.0, ge=0)
+    # How long each socket may take to flush its outbound buffer first
+    flush_timeout_seconds: float = Field(default=2.0, ge=0)
+    # Resume tokens let clients rejoin without another password check
+    resume_token_ttl_seconds: int = Field(default=60, ge=1)
+    # Shared by all replicas so any of them can accept a resume token.
+    # If unset, RECONNECT hints carry no token and clients rejoin normally.
+    resume_token_secret: str | None = Field(default=None)
+    # Bearer token for POST /drain (e.g. from a preStop hook); unset = disabled.
+    # Under `python -m app` a SIGTERM drains too, without any token.
+    admin_token: str | None = Field(default=None)
+
+
+# ---------- Diagnostics ----------
+
+class DiagnosticsSettings(BaseModel):
+    # Opt-in event-loop lag probe and stall watchdog
+    enabled: bool = Field(default=False)
+    # How often the probe schedules itself; lag is how late it wakes up
+    probe_interval_ms: float = Field(default=100.0, gt=0)
+    # A callback holding the loop longer than this is reported as a stall
+    slow_callback_ms: float = Field(default=100.0, gt=0)
+    # Fraction of stalls whose stack is captured (formatting is the costly part)
+    stack_sample_rate: float = Field(default=1.0, ge=0, le=1)
+    stack_depth: int = Field(default=30, ge=1)
+    # Rolling report size
+    lag_window: int = Field(default=600, ge=1)
+    max_stalls: int = Field(default=50, ge=1)
+    # Bearer token for GET /debug/loop; unset = endpoint disabled (404)
+    admin_token: str | None = Field(default=None)
+
 
 # ---------- Logging ----------
 
@@ -46,6 +279,16 @@ class Settings(BaseSettings):
     app: AppSettings = Field(default_factory=AppSettings)
     server: ServerSettings = Field(default_factory=ServerSettings)
     database: DatabaseSettings
+    security: SecuritySettings = Field(default_factory=SecuritySettings)
+    room_cache: RoomCacheSettings = Field(default_factory=RoomCacheSettings)
+    room_create: RoomCreateSettings = Field(default_factory=RoomCreateSettings)
+    rate_limit: RateLimitSettings = Field(default_factory=RateLimitSettings)
+    backplane: BackplaneSettings = Field(default_factory=BackplaneSettings)
+    reaper: ReaperSettings = Field(default_factory=ReaperSettings)
+    websocket: WebSocketSettings = Field(default_factory=WebSocketSettings)
+    health: HealthSettings = Field(default_factory=HealthSettings)
+    drain: DrainSettings = Field(default_factory=DrainSettings)
+    diagnostics: DiagnosticsSettings = Field(default_factory=DiagnosticsSettings)
     logging: LoggingSettings = Field(default_factory=LoggingSettings)
 
     class Config:
@@ -1,58 +1,146 @@
-from typing import AsyncGenerator
+from __future__ import annotations
 
-from sqlalchemy import text
-from sqlalchemy.ext.asyncio import (
-    AsyncEngine,
-    AsyncSession,
-    async_sessionmaker,
-    create_async_engine,
-)
+import time
+from typing import TYPE_CHECKING, AsyncGenerator, Literal
 
-from app.core.config import get_settings
+from app.core.config import DatabaseSettings, get_settings
+from app.core.metrics import metrics
+
+# SQLAlchemy (and through it the driver) is imported on first engine use,
+# not with this module: routers depend on get_db_session, and importing
+# the ORM would otherwise dominate app import time.
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
 
 # -------------------------------------------------------------------
-# Engine & sessionmaker (lazy singletons)
+# Engines & sessionmakers (lazy singletons, one per pool)
 # -------------------------------------------------------------------
 
-_engine: AsyncEngine | None = None
-_sessionmaker: async_sessionmaker[AsyncSession] | None = None
+# "default" serves user-facing requests; "background" serves maintenance
+Pool = Literal["default", "background"]
+
+_engines: dict[str, AsyncEngine] = {}
+_sessionmakers: dict[str, async_sessionmaker[AsyncSession]] = {}
+
+_query_seconds = metrics.histogram(
+    "wwi_db_query_seconds", "Database statement execution time")
 
 
-def get_engine() -> AsyncEngine:
+def get_engine(pool: Pool = "default") -> AsyncEngine:
     """
-    Create and return the async SQLAlchemy engine.
+    Create and return the async SQLAlchemy engine for a pool.
     Created lazily and reused for the lifetime of the process.
+    The background pool falls back to the default one when disabled.
     """
-    global _engine
+    settings = get_settings().database
 
-    if _engine is None:
-        settings = get_settings()
+    if pool == "background" and settings.background_pool_size == 0:
+        pool = "default"
 
-        _engine = create_async_engine(
-            settings.database.url,
-            echo=settings.database.echo,
-            pool_size=settings.database.pool_size,
-            pool_pre_ping=True,
-        )
+    engine = _engines.get(pool)
+
+    if engine is None:
+        if pool == "background":
+            size, overflow = settings.background_pool_size, settings.background_max_overflow
+        else:
+            size, overflow = settings.pool_size, settings.max_overflow
+
+        engine = _engines[pool] = _create_engine(settings, size, overflow)
+
+    return engine
+
+
+def _create_engine(settings: DatabaseSettings, pool_size: int, max_overflow: int) -> AsyncEngine:
+    from sqlalchemy import make_url
+    from sqlalchemy.ext.asyncio import create_async_engine
 
-    return _engine
+    connect_args = {}
+    if make_url(settings.url).get_driver_name() == "asyncpg":
+        # SQLAlchemy's adapter cache and asyncpg's own cache
+        connect_args = {
+            "prepared_statement_cache_size": settings.statement_cache_size,
+            "statement_cache_size": settings.statement_cache_size,
+        }
 
+    engine = create_async_engine(
+        settings.url,
+        echo=settings.echo,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=settings.pool_timeout_seconds,
+        pool_recycle=settings.pool_recycle_seconds,
+        pool_pre_ping=settings.validation == "pre_ping",
+        connect_args=connect_args,
+    )
 
-def get_sessionmaker() -> async_sessionmaker[AsyncSession]:
+    _instrument(engine)
+    if settings.validation == "idle":
+        _validate_idle(engine, settings.validate_idle_after_seconds)
+
+    return engine
+
+
+def _validate_idle(engine: AsyncEngine, idle_after: float) -> None:
     """
-    Create and return an async sessionmaker.
+    Ping a connection on checkout only if it sat idle in the pool for
+    longer than idle_after. A failed ping raises DisconnectionError, which
+    makes the pool discard it and hand out a fresh connection instead.
     """
-    global _sessionmaker
+    from sqlalchemy import event
+    from sqlalchemy.exc import DisconnectionError
+
+    sync_engine = engine.sync_engine
 
-    if _sessionmaker is None:
-        engine = get_engine()
+    @event.listens_for(sync_engine, "checkin")
+    def _checkin(dbapi_connection, record):
+        record.info["idle_since"] = time.monotonic()
 
-        _sessionmaker = async_sessionmaker(
-            bind=engine,
+    @event.listens_for(sync_engine, "checkout")
+    def _checkout(dbapi_connection, record, proxy):
+        idle_since = record.info.pop("idle_since", None)
+        if idle_since is None or time.monotonic() - idle_since < idle_after:
+            return
+
+        try:
+            sync_engine.dialect.do_ping(dbapi_connection)
+        except Exception as exc:
+            raise DisconnectionError("Idle connection failed validation") from exc
+
+
+def _instrument(engine: AsyncEngine) -> None:
+    """
+    Time every statement from cursor execute to result.
+    """
+    from sqlalchemy import event
+
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _start(conn, cursor, statement, parameters, context, executemany):
+        conn.info["query_start"] = time.perf_counter()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _stop(conn, cursor, statement, parameters, context, executemany):
+        start = conn.info.pop("query_start", None)
+        if start is not None:
+            _query_seconds.observe(time.perf_counter() - start)
+
+
+def get_sessionmaker(pool: Pool = "default") -> async_sessionmaker[AsyncSession]:
+    """
+    Create and return an async sessionmaker bound to a pool's engine.
+    """
+    sessionmaker = _sessionmakers.get(pool)
+
+    if sessionmaker is None:
+        from sqlalchemy.ext.asyncio import async_sessionmaker
+
+        sessionmaker = _sessionmakers[pool] = async_sessionmaker(
+            bind=get_engine(pool),
             expire_on_commit=False,
         )
 
-    return _sessionmaker
+    return sessionmaker
 
 
 # -------------------------------------------------------------------
@@ -74,13 +162,26 @@ async def get_db_session() -> AsyncGenerator[AsyncSession, None]:
 # Connectivity check (used in lifespan / readiness)
 # -------------------------------------------------------------------
 
-async def check_database_connection() -> None:
+async def check_database_connection(pool: Pool = "default") -> None:
     """
     Verify that the database is reachable.
     Fails fast if configuration or connectivity is broken.
     """
-    engine = get_engine()
+    from sqlalchemy import text
+
+    engine = get_engine(pool)
 
     async with engine.connect() as conn:
         await conn.execute(text("SELECT 1"))
-    
\ No newline at end of file
+    
+
+
+async def dispose_engines() -> None:
+    """
+    Close every pooled connection. Called on shutdown.
+    """
+    for engine in _engines.values():
+        await engine.dispose()
+
+    _engines.clear()
+    _sessionmakers.clear()
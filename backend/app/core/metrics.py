@@ -0,0 +1,207 @@
+"""
+Minimal in-process metrics with Prometheus text exposition.
+
+Recording is a plain attribute update on the event-loop thread: no locks,
+and no allocation beyond the float being added. Label children are
+created once on first use and reused afterwards. Values that already
+live elsewhere (registry size, token store size, ...) are exposed
+through callbacks read at scrape time instead of being mirrored.
+"""
+import abc
+from bisect import bisect_left
+from typing import Callable, Iterable
+
+# Latency buckets in seconds, from sub-millisecond dict hits to slow queries
+DEFAULT_BUCKETS: tuple[float, ...] = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+)
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{n}="{v}"' for n, v in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric(abc.ABC):
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: dict[tuple[str, ...], "_Metric"] = {}
+
+    def labels(self, *values: str):
+        child = self._children.get(values)
+        if child is None:
+            child = self._children[values] = self._new_child()
+        return child
+
+    def _new_child(self) -> "_Metric":
+        return type(self)(self.name, self.documentation)
+
+    def _series(self) -> Iterable[tuple[tuple[str, ...], "_Metric"]]:
+        if self.labelnames:
+            return self._children.items()
+        return (((), self),)
+
+    def expose(self) -> list[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        for values, child in self._series():
+            lines.extend(child._samples(_format_labels(self.labelnames, values), values))
+        return lines
+
+    @abc.abstractmethod
+    def _samples(self, labels: str, values: tuple[str, ...]) -> list[str]:
+        ...
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        callback: Callable[[], float] | None = None,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.value = 0.0
+        self._callback = callback
+
+    def inc(self, amount: float = 1) -> None:
+        self.value += amount
+
+    def _samples(self, labels: str, values: tuple[str, ...]) -> list[str]:
+        value = self._callback() if self._callback is not None else self.value
+        return [f"{self.name}{labels} {_format_value(value)}"]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        callback: Callable[[], float] | None = None,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.value = 0.0
+        self._callback = callback
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+    def inc(self, amount: float = 1) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1) -> None:
+        self.value -= amount
+
+    def _samples(self, labels: str, values: tuple[str, ...]) -> list[str]:
+        value = self._callback() if self._callback is not None else self.value
+        return [f"{self.name}{labels} {_format_value(value)}"]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._bounds = tuple(sorted(buckets))
+        # One slot per bound plus +Inf; cumulated only at scrape time
+        self._counts = [0] * (len(self._bounds) + 1)
+        self.sum = 0.0
+
+    def _new_child(self) -> "Histogram":
+        return Histogram(self.name, self.documentation, buckets=self._bounds)
+
+    def observe(self, value: float) -> None:
+        self._counts[bisect_left(self._bounds, value)] += 1
+        self.sum += value
+
+    @property
+    def count(self) -> int:
+        return sum(self._counts)
+
+    def _samples(self, labels: str, values: tuple[str, ...]) -> list[str]:
+        base = labels[1:-1] + "," if labels else ""
+        lines = []
+        cumulative = 0
+        for bound, count in zip((*self._bounds, float("inf")), self._counts):
+            cumulative += count
+            lines.append(
+                f'{self.name}_bucket{{{base}le="{_format_value(bound)}"}} {cumulative}')
+        lines.append(f"{self.name}_sum{labels} {_format_value(self.sum)}")
+        lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._metrics: dict[str, _Metric] = {}
+
+    def _register(self, metric: _Metric) -> _Metric:
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        callback: Callable[[], float] | None = None,
+    ) -> Counter:
+        return self._register(Counter(name, documentation, labelnames, callback))
+
+    def gauge(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        callback: Callable[[], float] | None = None,
+    ) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames, callback))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def expose(self) -> str:
+        lines: list[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.expose())
+        return "\n".join(lines) + "\n"
+
+
+# Process-wide registry
+metrics = MetricsRegistry()
@@ -0,0 +1,149 @@
+"""
+Binary WebSocket frame envelope.
+
+Every binary frame starts with a fixed 24-byte header (network order):
+
+    type         u8    FrameType
+    flags        u8    FLAG_* bits; clients must send 0
+    sender_slot  u16   per-room slot of the sending connection
+    room_id      16s   raw room UUID
+    length       u32   payload length in bytes
+
+followed by exactly `length` bytes of opaque payload. The server only
+validates the header; payloads are relayed as-is without being decoded.
+The exception is presence: RENAME payloads are read by the server, and
+ROSTER / PRESENCE payloads are compact JSON written by it.
+"""
+import struct
+from enum import IntEnum
+from typing import NamedTuple
+from uuid import UUID
+
+HEADER = struct.Struct("!BBH16sI")
+HEADER_SIZE = HEADER.size
+
+MAX_SLOT = 0xFFFF
+
+# Payload is raw DEFLATE, decodable on its own
+FLAG_DEFLATE = 0x01
+# Payload continues the connection's DEFLATE stream (sync-flushed, with
+# the trailing 00 00 ff ff removed, as in permessage-deflate)
+FLAG_DEFLATE_STREAM = 0x02
+# Payload starts with a u64 room sequence number (see SEQUENCE), followed
+# by the original payload; the DEFLATE flags apply to that remainder only.
+# Bits 32..51 are the epoch of the process-local ring that numbered the
+# frame; only the lower 32 count up (values stay below 2**53).
+FLAG_SEQ = 0x04
+
+SEQUENCE = struct.Struct("!Q")
+
+
+class FrameType(IntEnum):
+    # Client -> server -> room: a chat message. Batches (coalescing,
+    # replay) may hand a client its own messages back; skip envelopes
+    # carrying your own sender slot.
+    MESSAGE = 1
+    # Server -> client: admission ack carrying the assigned sender slot
+    WELCOME = 2
+    # Server -> client: about to close for a restart; payload is an ASCII
+    # resume token to pass as /ws?resume=... on reconnect, or empty if
+    # resume is not configured (rejoin with the room password instead)
+    RECONNECT = 3
+    # Client -> server: set this connection's display name (UTF-8 payload)
+    RENAME = 4
+    # Server -> client: full roster, sent once after admission
+    # {"members": {"<slot>": "<name>", ...}}
+    ROSTER = 5
+    # Server -> client: batched roster changes since the last batch
+    # {"joined": {"<slot>": "<name>"}, "renamed": {...}, "left": [<slot>, ...]}
+    PRESENCE = 6
+    # Server -> client: frames after the requested /ws?since= sequence are
+    # no longer held; payload is the oldest sequence still available as a
+    # u64 (0 if none). Whatever is held is replayed right after, unless
+    # since came from another epoch (another replica, or an evicted ring):
+    # then nothing is replayed.
+    HISTORY_GAP = 7
+
+
+# Frame types a client may send
+CLIENT_FRAME_TYPES = frozenset({FrameType.MESSAGE, FrameType.RENAME})
+
+
+class FrameError(ValueError):
+    pass
+
+
+class FrameHeader(NamedTuple):
+    type: int
+    flags: int
+    sender_slot: int
+    room_id: bytes
+    length: int
+
+
+def encode_frame(
+    frame_type: FrameType,
+    sender_slot: int,
+    room_id: UUID,
+    payload: bytes = b"",
+) -> bytes:
+    header = HEADER.pack(frame_type, 0, sender_slot, room_id.bytes, len(payload))
+    return header + payload if payload else header
+
+
+def stamp_sequence(frame: bytes, seq: int) -> bytes:
+    """
+    Return a copy of frame carrying seq in front of its payload.
+    """
+    frame_type, flags, slot, room_id, length = HEADER.unpack_from(frame)
+    return b"".join((
+        HEADER.pack(frame_type, flags | FLAG_SEQ, slot, room_id, length + SEQUENCE.size),
+        SEQUENCE.pack(seq),
+        memoryview(frame)[HEADER_SIZE:],
+    ))
+
+
+def parse_header(frame: bytes) -> FrameHeader:
+    if len(frame) < HEADER_SIZE:
+        raise FrameError("Frame shorter than header")
+    return FrameHeader._make(HEADER.unpack_from(frame))
+
+
+def validate_client_frame(
+    frame: bytes,
+    *,
+    room_id: bytes,
+    sender_slot: int,
+    max_payload: int,
+) -> FrameHeader:
+    """
+    Check that a client frame is a well-formed MESSAGE or RENAME from
+    this sender to this room. The payload itself is not inspected here.
+    """
+    header = parse_header(frame)
+
+    if header.type not in CLIENT_FRAME_TYPES:
+        raise FrameError("Unexpected frame type")
+    if header.flags != 0:
+        raise FrameError("Unknown flags")
+    if header.sender_slot != sender_slot:
+        raise FrameError("Sender slot mismatch")
+    if header.room_id != room_id:
+        raise FrameError("Room mismatch")
+    if header.length != len(frame) - HEADER_SIZE:
+        raise FrameError("Payload length mismatch")
+    if header.length > max_payload:
+        raise FrameError("Payload too large")
+
+    return header
+
+
+def validate_client_text(text: str, *, max_payload: int) -> None:
+    """
+    Apply the binary payload cap to a text message, in UTF-8 bytes.
+    """
+    # A character is 1..4 bytes: encode only when the count can't decide
+    if len(text) > max_payload or (
+        len(text) * 4 > max_payload and len(text.encode("utf-8")) > max_payload
+    ):
+        raise FrameError("Payload too large")
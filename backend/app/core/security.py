@@ -1,7 +1,59 @@
-from argon2 import PasswordHasher
-from argon2.exceptions import VerifyMismatchError
+from __future__ import annotations
 
-_ph = PasswordHasher()
+import asyncio
+import dataclasses
+import logging
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Callable, TypeVar
+
+from app.core.config import SecuritySettings, get_settings
+from app.core.metrics import metrics
+
+# argon2 is imported when the hasher is first built, normally by
+# configure_password_hasher in a worker thread at startup
+if TYPE_CHECKING:
+    from argon2 import Parameters, PasswordHasher
+
+T = TypeVar("T")
+
+logger = logging.getLogger(__name__)
+
+_ph: PasswordHasher | None = None
+
+_CALIBRATION_MAX_TIME_COST = 64
+
+_verify_seconds = metrics.histogram(
+    "wwi_password_verify_seconds",
+    "Password verification time, including time queued for a worker",
+)
+_busy_rejections = metrics.counter(
+    "wwi_hash_pool_rejections_total",
+    "Hashing jobs refused because the pool was saturated",
+)
+
+
+class PasswordHasherBusyError(Exception):
+    """
+    Raised when the hashing pool is saturated and cannot accept more work.
+    """
+    pass
+
+
+def _hasher() -> PasswordHasher:
+    """
+    Return the process-wide hasher, with library defaults if
+    configure_password_hasher hasn't run.
+    """
+    global _ph
+
+    if _ph is None:
+        from argon2 import PasswordHasher
+
+        _ph = PasswordHasher()
+
+    return _ph
 
 
 def hash_password(password: str) -> str:
@@ -9,7 +61,7 @@ def hash_password(password: str) -> str:
     Hash a plaintext password using Argon2 (argon2-cffi).
     Returns the encoded Argon2 hash string.
     """
-    return _ph.hash(password)
+    return _hasher().hash(password)
 
 
 def verify_password(stored_hash: str, password: str) -> bool:
@@ -18,8 +70,210 @@ def verify_password(stored_hash: str, password: str) -> bool:
     Returns True if the password matches, False otherwise.
     """
     try:
-        return _ph.verify(stored_hash, password)
-    except VerifyMismatchError:
+        return _hasher().verify(stored_hash, password)
+    except Exception:
+        # VerifyMismatchError, or a malformed stored hash
         return False
+
+
+def needs_rehash(stored_hash: str) -> bool:
+    """
+    True if the hash was made with parameters other than the current ones.
+    """
+    try:
+        return _hasher().check_needs_rehash(stored_hash)
     except Exception:
         return False
+
+
+# -------------------------------------------------------------------
+# Cost profiles & calibration
+# -------------------------------------------------------------------
+
+def calibrate_parameters(
+    base: Parameters,
+    target_verify_ms: float,
+) -> Parameters:
+    """
+    Pick the smallest time cost whose verify latency on this host reaches
+    target_verify_ms, keeping memory cost and parallelism from base.
+    """
+    from argon2 import PasswordHasher
+
+    time_cost = 1
+
+    while True:
+        params = dataclasses.replace(base, time_cost=time_cost)
+        ph = PasswordHasher.from_parameters(params)
+        encoded = ph.hash("calibration")
+
+        start = time.perf_counter()
+        ph.verify(encoded, "calibration")
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        if elapsed_ms >= target_verify_ms or time_cost >= _CALIBRATION_MAX_TIME_COST:
+            return params
+
+        # Verify time is roughly linear in time cost
+        estimate = math.ceil(time_cost * target_verify_ms / max(elapsed_ms, 0.01))
+        time_cost = min(max(time_cost + 1, estimate), _CALIBRATION_MAX_TIME_COST)
+
+
+def resolve_parameters(settings: SecuritySettings) -> Parameters:
+    """
+    Build Argon2 parameters from the configured profile and overrides.
+    """
+    from argon2 import profiles
+
+    base = {
+        "low_memory": profiles.RFC_9106_LOW_MEMORY,
+        "high_memory": profiles.RFC_9106_HIGH_MEMORY,
+    }.get(settings.hash_profile, profiles.RFC_9106_LOW_MEMORY)
+
+    overrides = {
+        "time_cost": settings.hash_time_cost,
+        "memory_cost": settings.hash_memory_cost,
+        "parallelism": settings.hash_parallelism,
+    }
+    base = dataclasses.replace(
+        base, **{k: v for k, v in overrides.items() if v is not None})
+
+    if settings.hash_profile == "calibrate" and settings.hash_time_cost is None:
+        return calibrate_parameters(base, settings.hash_target_verify_ms)
+
+    return base
+
+
+def configure_password_hasher(settings: SecuritySettings) -> Parameters:
+    """
+    Replace the process-wide hasher with one built from settings.
+    Blocking (calibration runs real hashes); call it off the event loop.
+    """
+    global _ph
+
+    from argon2 import PasswordHasher
+
+    params = resolve_parameters(settings)
+    _ph = PasswordHasher.from_parameters(params)
+
+    logger.info(
+        "Argon2 configured: time_cost=%d memory_cost=%d parallelism=%d",
+        params.time_cost, params.memory_cost, params.parallelism,
+    )
+
+    return params
+
+
+# -------------------------------------------------------------------
+# Async variants (bounded worker pool)
+# -------------------------------------------------------------------
+
+class _HashingPool:
+    """
+    Size-limited thread pool for Argon2 work.
+
+    argon2-cffi releases the GIL while hashing, so threads run in
+    parallel and the event loop stays free. Jobs beyond
+    workers + queue_depth are rejected instead of queued indefinitely.
+    """
+
+    def __init__(self, workers: int, queue_depth: int) -> None:
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="argon2")
+        self._capacity = workers + queue_depth
+        self._inflight = 0
+
+    @property
+    def inflight(self) -> int:
+        return self._inflight
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    async def run(self, fn: Callable[..., T], *args) -> T:
+        if self._inflight >= self._capacity:
+            _busy_rejections.inc()
+            raise PasswordHasherBusyError("Password hashing pool is saturated")
+
+        loop = asyncio.get_running_loop()
+        self._inflight += 1
+        future = self._executor.submit(fn, *args)
+        # Released when the job ends, not when the caller stops waiting:
+        # a cancelled request's hash keeps its worker busy until it's done
+        future.add_done_callback(lambda _: self._job_done(loop))
+        return await asyncio.wrap_future(future)
+
+    def _job_done(self, loop: asyncio.AbstractEventLoop) -> None:
+        # Runs on the worker thread; the counter belongs to the loop
+        try:
+            loop.call_soon_threadsafe(self._release)
+        except RuntimeError:
+            # Loop already closed (shutdown)
+            pass
+
+    def _release(self) -> None:
+        self._inflight -= 1
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+_pool: _HashingPool | None = None
+
+
+def get_hashing_pool() -> _HashingPool:
+    """
+    Create and return the process-wide hashing pool.
+    """
+    global _pool
+
+    if _pool is None:
+        settings = get_settings().security
+        _pool = _HashingPool(settings.hash_workers, settings.hash_queue_depth)
+
+    return _pool
+
+
+def hashing_pool_saturation() -> float:
+    """
+    Fraction of the pool's capacity (workers + queue) currently in use.
+    """
+    if _pool is None:
+        return 0.0
+    return _pool.inflight / _pool.capacity
+
+
+metrics.gauge(
+    "wwi_hash_pool_saturation",
+    "Fraction of hashing pool capacity in use",
+    callback=hashing_pool_saturation,
+)
+
+
+def shutdown_hashing_pool() -> None:
+    global _pool
+
+    if _pool is not None:
+        _pool.shutdown()
+        _pool = None
+
+
+async def hash_password_async(password: str) -> str:
+    """
+    Hash a password on the worker pool.
+    Raises PasswordHasherBusyError if the pool is saturated.
+    """
+    return await get_hashing_pool().run(hash_password, password)
+
+
+async def verify_password_async(stored_hash: str, password: str) -> bool:
+    """
+    Verify a password on the worker pool.
+    Raises PasswordHasherBusyError if the pool is saturated.
+    """
+    start = time.perf_counter()
+    verified = await get_hashing_pool().run(verify_password, stored_hash, password)
+    # Completed checks only; rejections have their own counter
+    _verify_seconds.observe(time.perf_counter() - start)
+    return verified
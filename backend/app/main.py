@@ -1,14 +1,41 @@
-from contextlib import asynccontextmanager
+import asyncio
+import logging
+from contextlib import asynccontextmanager, suppress
 
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI
 
 from app.core.config import get_settings
-from app.core.db import check_database_connection
+from app.core.db import check_database_connection, dispose_engines
+from app.core.security import configure_password_hasher, shutdown_hashing_pool
 from app.api.health import router as health_router
 from app.api.ready import router as ready_router
+from app.api.debug import router as debug_router
+from app.api.drain import router as drain_router
+from app.api.metrics import router as metrics_router
+from app.api.ws import router as ws_router
 from app.api.v1.rooms import router as rooms_router
 
+from app.services.join_token_service import run_token_cleanup
+from app.services.drain_service import drain_in_progress, reset_drain
+from app.state.backplane import create_backplane
 from app.state.connections import connections
+from app.state.health import HealthMonitor, set_health_monitor
+from app.state.loop_monitor import LoopMonitor, set_loop_monitor
+from app.state.rate_limiter import close_rate_limiter, get_rate_limiter
+
+logger = logging.getLogger(__name__)
+
+
+async def _check_database_in_background() -> None:
+    """
+    Startup connectivity check that doesn't hold up startup. /ready
+    gates traffic on the health monitor meanwhile; this only makes a
+    broken URL or unreachable server show up in the logs straight away.
+    """
+    try:
+        await check_database_connection()
+    except Exception:
+        logger.exception("Database unreachable at startup; /ready stays 503 until it answers")
 
 
 # -------------------------------------------------------------------
@@ -17,15 +44,82 @@ from app.state.connections import connections
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Load settings (forces config validation early)
-    get_settings()
+    settings = get_settings()
+    reset_drain()
+
+    # Argon2 cost (may calibrate against this host, so keep it off the loop)
+    await asyncio.to_thread(configure_password_hasher, settings.security)
 
     # Infra-only startup check
-    await check_database_connection()
+    blocking_check = settings.database.startup_check == "blocking"
+    if blocking_check:
+        await check_database_connection()
+
+    # Built now so a missing Redis extra fails startup, not the first join
+    get_rate_limiter()
+
+    # Cross-process fan-out (none in single-process mode)
+    backplane = create_backplane(settings.backplane)
+    if backplane is not None:
+        # Rooms reaped by any node are closed here too
+        from app.services.room_reaper_service import forget_rooms
+
+        await backplane.start(
+            connections.deliver_remote, forget_rooms, connections.publish_rosters)
+        connections.attach_backplane(backplane)
+
+    # Background maintenance
+    # Readiness is served from this monitor's cached checks
+    monitor = HealthMonitor(settings.health)
+    if blocking_check:
+        await monitor.refresh()
+    set_health_monitor(monitor)
+
+    # Until its first refresh the monitor has no snapshot and /ready
+    # answers "starting"
+    background = [
+        asyncio.create_task(run_token_cleanup()),
+        asyncio.create_task(monitor.run()),
+    ]
+
+    if not blocking_check:
+        background.append(asyncio.create_task(_check_database_in_background()))
+
+    if settings.reaper.enabled:
+        # Pulls in the ORM; only worth loading if the reaper runs here
+        from app.services.room_reaper_service import run_room_reaper
+
+        background.append(asyncio.create_task(run_room_reaper(settings.reaper)))
+
+    # Opt-in loop lag / stall diagnostics, served on /debug/loop
+    if settings.diagnostics.enabled:
+        loop_monitor = LoopMonitor(settings.diagnostics)
+        set_loop_monitor(loop_monitor)
+        background.append(asyncio.create_task(loop_monitor.run()))
 
     yield
 
-    # No shutdown logic in Phase 1
-    # (connections, rooms, workers come later)
+    # Let a drain started by POST /drain (or by SIGTERM under
+    # `python -m app`) finish. This does not drain by itself: uvicorn has
+    # already closed any socket still open by now, with no RECONNECT hint.
+    drain = drain_in_progress()
+    if drain is not None:
+        await drain
+
+    for task in background:
+        task.cancel()
+    for task in background:
+        with suppress(asyncio.CancelledError):
+            await task
+
+    if backplane is not None:
+        connections.attach_backplane(None)
+        await backplane.stop()
+
+    set_loop_monitor(None)
+    shutdown_hashing_pool()
+    await close_rate_limiter()
+    await dispose_engines()
 
 
 # -------------------------------------------------------------------
@@ -43,25 +137,28 @@ def create_app() -> FastAPI:
     # REST routers
     app.include_router(health_router)
     app.include_router(ready_router)
+    app.include_router(drain_router)
+    app.include_router(metrics_router)
+    app.include_router(debug_router)
 
     # Versioned API router
     app.include_router(rooms_router, prefix="/api")
+
+    # WebSocket (room broadcast)
+    app.include_router(ws_router)
     return app
 
 
-app = create_app()
+def __getattr__(name: str) -> FastAPI:
+    """
+    Build the module-level app on first access rather than at import, so
+    "uvicorn app.main:app" keeps working while importing this module
+    (tooling, --factory, reload workers) stays cheap.
+    """
+    global app
 
+    if name == "app":
+        app = create_app()
+        return app
 
-# -------------------------------------------------------------------
-# WebSocket (Phase 1: blind pipe)
-# -------------------------------------------------------------------
-@app.websocket("/ws")
-async def websocket_endpoint(ws: WebSocket):
-    await ws.accept()
-
-    try:
-        while True:
-            data = await ws.receive_text()
-            await ws.send_text(data)
-    finally:
-        connections.disconnect(ws)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -5,7 +5,8 @@ from typing import Optional
 
 
 class CreateRoomSchema(BaseModel):
-    name: str = Field(..., description="Name of the room")
+    # rooms.name is String(100)
+    name: str = Field(..., max_length=100, description="Name of the room")
     password: str = Field(..., description="Password for the room")
     expires_at: Optional[datetime] = Field(
         None, description="Optional expiration time for the room (UTC)"
@@ -17,6 +18,16 @@ class CreateRoomResponseSchema(BaseModel):
                            description="Unique code for the created room")
 
 
+class BulkCreateRoomsSchema(BaseModel):
+    rooms: list[CreateRoomSchema] = Field(..., min_length=1,
+                                          description="Rooms to create")
+
+
+class BulkCreateRoomsResponseSchema(BaseModel):
+    room_codes: list[str] = Field(...,
+                                  description="Codes of the created rooms, in request order")
+
+
 class JoinRoomSchema(BaseModel):
     room_code: str = Field(..., min_length=4, max_length=16,
                            description="Human-shareable room code")
@@ -0,0 +1,93 @@
+import asyncio
+import logging
+import random
+
+from fastapi import status
+
+from app.core.config import DrainSettings
+from app.core.protocol import FrameType, encode_frame
+from app.services.resume_token_service import (
+    generate_resume_token,
+    resume_tokens_enabled,
+)
+from app.state.connections import Connection, connections
+
+logger = logging.getLogger(__name__)
+
+_drain_task: asyncio.Task | None = None
+
+
+def start_drain(settings: DrainSettings) -> asyncio.Task:
+    """
+    Enter drain mode and start closing sockets in the background.
+    Idempotent: later calls return the drain already in progress.
+    """
+    global _drain_task
+
+    if _drain_task is None:
+        connections.draining = True
+        _drain_task = asyncio.create_task(_drain(settings))
+
+    return _drain_task
+
+
+def drain_in_progress() -> asyncio.Task | None:
+    """
+    The drain started by start_drain, if any (possibly already finished).
+    """
+    return _drain_task
+
+
+def reset_drain() -> None:
+    """
+    Leave drain mode; called at startup so an app rebuilt in the same
+    process (tests, benchmarks) doesn't inherit the last one's drain.
+    """
+    global _drain_task
+
+    _drain_task = None
+    connections.draining = False
+
+
+async def _drain(settings: DrainSettings) -> None:
+    """
+    Close every open socket, spread evenly over the drain window so the
+    reconnects don't arrive all at once.
+    """
+    members = connections.all_connections()
+    random.shuffle(members)
+
+    step = settings.window_seconds / len(members) if members else 0
+
+    logger.info("Draining %d connections over %.1fs", len(members), settings.window_seconds)
+
+    await asyncio.gather(*(
+        _close_with_hint(connection, i * step, settings)
+        for i, connection in enumerate(members)
+    ))
+
+
+async def _close_with_hint(
+    connection: Connection,
+    delay: float,
+    settings: DrainSettings,
+) -> None:
+    await asyncio.sleep(delay)
+
+    # Closed by its client while we waited; nothing would flush the hint
+    if not connections.is_registered(connection):
+        return
+
+    resume = b""
+    if resume_tokens_enabled():
+        resume = generate_resume_token(connection.room_id).encode("ascii")
+
+    hint = encode_frame(FrameType.RECONNECT, connection.slot, connection.room_id, resume)
+    connection.enqueue({"type": "websocket.send", "bytes": hint}, len(hint))
+
+    await connections.close_gracefully(
+        connection,
+        code=status.WS_1012_SERVICE_RESTART,
+        reason="reconnect",
+        flush_timeout=settings.flush_timeout_seconds,
+    )
@@ -1,21 +1,48 @@
-from dataclasses import dataclass
+import asyncio
+import base64
+import binascii
+import secrets
+import struct
+import time
+from collections import deque
 from datetime import datetime, timedelta, timezone
 from uuid import UUID
-import secrets
+
+from app.core.metrics import metrics
 
 
 JOIN_TOKEN_TTL_MINUTES: int = 10
+JOIN_TOKEN_CLEANUP_INTERVAL_SECONDS: float = 30.0
+JOIN_TOKEN_BYTES: int = 32
 
+# Packed record layout: 16-byte raw room UUID + monotonic expiry in ns.
+# An expiry of 0 means the token never expires.
+_RECORD = struct.Struct("<16sq")
+_NO_EXPIRY = 0
 
-@dataclass
-class JoinTokenRecord:
-    room_id: UUID
-    issued_at: datetime
-    used: bool = False
-    expires_at: datetime | None = None
+# Keyed by the raw token bytes rather than the 43-char urlsafe string.
+_join_token_storage: dict[bytes, bytes] = {}
 
+# Token keys in issue order. With a fixed TTL this is also expiry order,
+# so the oldest entry is always the next one to expire. Keys of consumed
+# tokens are left in place and skipped when they reach the front.
+_join_token_expiry: deque[bytes] = deque()
 
-_join_token_storage: dict[str, JoinTokenRecord] = {}
+metrics.gauge(
+    "wwi_join_tokens", "Outstanding join tokens",
+    callback=lambda: len(_join_token_storage))
+
+
+def _decode_token(token: str) -> bytes | None:
+    try:
+        key = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+    except (binascii.Error, ValueError):
+        return None
+
+    if len(key) != JOIN_TOKEN_BYTES:
+        return None
+
+    return key
 
 
 def generate_join_token(room_id: UUID) -> tuple[str, datetime]:
@@ -25,18 +52,18 @@ def generate_join_token(room_id: UUID) -> tuple[str, datetime]:
     The token is valid for a limited time (JOIN_TOKEN_TTL_MINUTES) and can only be used once.
     """
 
-    token = secrets.token_urlsafe(32)
-    now = datetime.now(timezone.utc)
+    key = secrets.token_bytes(JOIN_TOKEN_BYTES)
+    token = base64.urlsafe_b64encode(key).rstrip(b"=").decode("ascii")
 
     expires_at = None
+    deadline = _NO_EXPIRY
     if JOIN_TOKEN_TTL_MINUTES is not None:
-        expires_at = now + timedelta(minutes=JOIN_TOKEN_TTL_MINUTES)
+        ttl = timedelta(minutes=JOIN_TOKEN_TTL_MINUTES)
+        expires_at = datetime.now(timezone.utc) + ttl
+        deadline = time.monotonic_ns() + int(ttl.total_seconds() * 1_000_000_000)
+        _join_token_expiry.append(key)
 
-        _join_token_storage[token] = JoinTokenRecord(
-            room_id=room_id,
-            issued_at=now,
-            expires_at=expires_at,
-        )
+    _join_token_storage[key] = _RECORD.pack(room_id.bytes, deadline)
 
     return token, expires_at
 
@@ -50,43 +77,72 @@ def validate_join_token(token: str) -> UUID | None:
     - It has not expired
     - It has not been used before
 
-    If the token is valid, it is marked as used to prevent reuse.
+    The token is removed from storage on lookup, so it can never be reused
+    and its memory is released immediately.
     """
 
-    record = _join_token_storage.get(token)
+    key = _decode_token(token)
+
+    if key is None:
+        return None
+
+    record = _join_token_storage.pop(key, None)
 
     if record is None:
         return None
 
-    now = datetime.now(timezone.utc)
+    room_id, deadline = _RECORD.unpack(record)
 
-    if record.used:
+    if deadline != _NO_EXPIRY and deadline < time.monotonic_ns():
         return None
 
-    if record.expires_at is not None:
-        if record.expires_at < datetime.now(tz=timezone.utc):
-            _join_token_storage.pop(token, None)
-            return None
+    return UUID(bytes=room_id)
 
-    record.used = True
-    return record.room_id
 
+def cleanup_expired_tokens() -> int:
+    """
+    Remove expired tokens from the storage.
 
-def cleanup_expired_tokens() -> None:
+    Only expired (or already consumed) entries at the front of the queue
+    are visited, so the cost is proportional to the number of expired
+    tokens, not the store size.
+    Returns the number of tokens removed.
     """
-    Cleanup expired tokens from the storage.
 
-    This function can be called periodically (e.g., via a background task) to remove expired tokens.
+    now = time.monotonic_ns()
+    removed = 0
+
+    while _join_token_expiry:
+        key = _join_token_expiry[0]
+        record = _join_token_storage.get(key)
+
+        if record is not None:
+            _, deadline = _RECORD.unpack(record)
+            if deadline >= now:
+                break
+            del _join_token_storage[key]
+            removed += 1
+
+        _join_token_expiry.popleft()
+
+    return removed
+
+
+def token_count() -> int:
+    """
+    Number of outstanding (issued, not yet used or reaped) tokens.
     """
+    return len(_join_token_storage)
 
-    now = datetime.now(timezone.utc)
-    tokens_to_cleanup = []
 
-    for token, record in _join_token_storage.items():
-        if record.used:
-            tokens_to_cleanup.append(token)
-        elif record.expires_at is not None and record.expires_at < now:
-            tokens_to_cleanup.append(token)
+async def run_token_cleanup(
+    interval_seconds: float = JOIN_TOKEN_CLEANUP_INTERVAL_SECONDS,
+) -> None:
+    """
+    Periodically drop expired tokens.
+    Intended to run as a background task for the lifetime of the app.
+    """
 
-    for token in tokens_to_cleanup:
-        _join_token_storage.pop(token, None)
+    while True:
+        await asyncio.sleep(interval_seconds)
+        cleanup_expired_tokens()
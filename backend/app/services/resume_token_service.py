@@ -0,0 +1,73 @@
+import base64
+import binascii
+import hashlib
+import hmac
+import struct
+import time
+from uuid import UUID
+
+from app.core.config import get_settings
+
+# room UUID (16) + expiry unix seconds (8) + truncated HMAC-SHA256 (16)
+_BODY = struct.Struct("!16sQ")
+_MAC_LEN = 16
+
+
+def resume_tokens_enabled() -> bool:
+    """
+    Resume tokens need a secret shared by all replicas: a client told to
+    reconnect is refused by the draining process, so only another one
+    would ever see its token.
+    """
+    return bool(get_settings().drain.resume_token_secret)
+
+
+def _sign(body: bytes) -> bytes:
+    key = get_settings().drain.resume_token_secret.encode("utf-8")
+    return hmac.new(key, body, hashlib.sha256).digest()[:_MAC_LEN]
+
+
+def generate_resume_token(room_id: UUID) -> str:
+    """
+    Issue a short-lived token that re-admits a client to its room.
+
+    Tokens are signed, not stored, so any replica sharing the secret can
+    check them with no DB access and no Argon2 verify. They are not
+    single-use; the short TTL bounds replay. Requires
+    resume_tokens_enabled().
+    """
+
+    ttl = get_settings().drain.resume_token_ttl_seconds
+    body = _BODY.pack(room_id.bytes, int(time.time()) + ttl)
+    token = body + _sign(body)
+
+    return base64.urlsafe_b64encode(token).rstrip(b"=").decode("ascii")
+
+
+def validate_resume_token(token: str) -> UUID | None:
+    """
+    Return the room ID for a valid, unexpired resume token.
+    """
+
+    if not resume_tokens_enabled():
+        return None
+
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+    except (binascii.Error, ValueError):
+        return None
+
+    if len(raw) != _BODY.size + _MAC_LEN:
+        return None
+
+    body, mac = raw[:_BODY.size], raw[_BODY.size:]
+
+    if not hmac.compare_digest(mac, _sign(body)):
+        return None
+
+    room_id, expires_at = _BODY.unpack(body)
+
+    if expires_at < time.time():
+        return None
+
+    return UUID(bytes=room_id)
@@ -1,20 +1,96 @@
+import asyncio
 import secrets
 import string
+import time
+import uuid
 from datetime import datetime, timezone
 from typing import Optional
 
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import get_settings
+from app.core.db import get_sessionmaker
+from app.core.metrics import metrics
 from app.schema.room import Room
-from app.core.security import hash_password
+from app.core.security import hash_password_async
+from app.services.room_join_service import snapshot_room
+from app.state.room_cache import get_room_cache
 
 
 ROOM_CODE_LENGTH = 6
+ROOM_CODE_MAX_LENGTH = 12  # rooms.room_code is String(12)
 ROOM_CODE_ALPHABET = string.ascii_uppercase + string.digits
+ROOM_CODE_MAX_ATTEMPTS = 8
 
+# Once this fraction of recent attempts collide, codes get one char longer.
+# The collision rate is a direct estimate of live rooms / code space.
+ROOM_CODE_GROW_AT_COLLISION_RATE = 0.1
+_COLLISION_EWMA_ALPHA = 0.05
 
-def _generate_room_code(length: int = ROOM_CODE_LENGTH) -> str:
-    return "".join(secrets.choice(ROOM_CODE_ALPHABET) for _ in range(length))
+
+class RoomCodeExhaustedError(Exception):
+    pass
+
+
+_create_seconds = metrics.histogram(
+    "wwi_room_create_seconds", "Time spent creating a room, including password hashing")
+_rooms_created = metrics.counter("wwi_rooms_created_total", "Rooms created")
+_code_collisions = metrics.counter(
+    "wwi_room_code_collisions_total", "Room code inserts that hit an existing code")
+
+
+class RoomCodeAllocator:
+    """
+    Draws random room codes and lengthens them as the space fills up.
+
+    Uniqueness itself is enforced by the insert (ON CONFLICT DO NOTHING);
+    the allocator only tracks how often that happens.
+    """
+
+    def __init__(
+        self,
+        length: int = ROOM_CODE_LENGTH,
+        max_length: int = ROOM_CODE_MAX_LENGTH,
+    ) -> None:
+        self.length = length
+        self._max_length = max_length
+        self._collision_rate = 0.0
+
+    def generate(self) -> str:
+        # One CSPRNG draw per code instead of one per character
+        base = len(ROOM_CODE_ALPHABET)
+        n = secrets.randbelow(base ** self.length)
+
+        chars = []
+        for _ in range(self.length):
+            n, i = divmod(n, base)
+            chars.append(ROOM_CODE_ALPHABET[i])
+
+        return "".join(chars)
+
+    def record(self, collided: bool) -> None:
+        self._collision_rate += _COLLISION_EWMA_ALPHA * (
+            float(collided) - self._collision_rate)
+
+        if (
+            self._collision_rate >= ROOM_CODE_GROW_AT_COLLISION_RATE
+            and self.length < self._max_length
+        ):
+            self.length += 1
+            self._collision_rate = 0.0
+
+
+_allocator = RoomCodeAllocator()
+
+
+def _insert_for(db: AsyncSession):
+    """
+    Dialect-specific INSERT construct (both support ON CONFLICT).
+    """
+    if db.get_bind().dialect.name == "sqlite":
+        return sqlite.insert
+    return postgresql.insert
 
 
 async def create_room(
@@ -27,24 +103,248 @@ async def create_room(
     """
     Create a new room and persist it.
 
+    With batching on, the insert is handed to the process-wide batcher and
+    shares one statement and one commit with other creates arriving in the
+    same window; db is then unused. Otherwise the room is inserted and
+    committed on db directly.
+
     This function assumes:
     - input validation is already done
     - db session lifecycle is managed by the caller
+
+    Raises:
+        RoomCodeExhaustedError: If no free code was found.
+    """
+
+    start = time.perf_counter()
+
+    room = _new_room(name, await hash_password_async(password), expires_at)
+
+    batcher = _get_batcher()
+    if batcher is not None:
+        await batcher.submit(room)
+    else:
+        await _insert_rooms(db, [room])
+        await db.commit()
+
+    _created([room])
+    _create_seconds.observe(time.perf_counter() - start)
+
+    return room
+
+
+async def create_rooms(
+    *,
+    db: AsyncSession,
+    rooms: list[tuple[str, str, Optional[datetime]]],
+) -> list[Room]:
+    """
+    Create many rooms, given as (name, password, expires_at), in one
+    transaction. Returns them in the same order.
+
+    Passwords are hashed a pool's worth at a time, so a large request
+    queues behind other work instead of tripping the busy limit.
+
+    Raises:
+        PasswordHasherBusyError: If the hashing pool is saturated.
+        RoomCodeExhaustedError: If no free code was found.
     """
 
-    room_code = _generate_room_code()
-    password_hash = hash_password(password)
+    step = get_settings().security.hash_workers
+    hashes: list[str] = []
+
+    for i in range(0, len(rooms), step):
+        hashes.extend(await asyncio.gather(*(
+            hash_password_async(password) for _, password, _ in rooms[i:i + step]
+        )))
+
+    created = [
+        _new_room(name, password_hash, expires_at)
+        for (name, _, expires_at), password_hash in zip(rooms, hashes)
+    ]
+
+    chunk = get_settings().room_create.batch_max_rooms
+    for i in range(0, len(created), chunk):
+        await _insert_rooms(db, created[i:i + chunk])
+    await db.commit()
+
+    _created(created)
+    return created
 
-    room = Room(
-        room_code=room_code,
+
+def _new_room(name: str, password_hash: str, expires_at: Optional[datetime]) -> Room:
+    return Room(
+        id=uuid.uuid4(),
         name=name,
         password_hash=password_hash,
         created_at=datetime.now(timezone.utc),
         expires_at=expires_at,
     )
 
-    db.add(room)
-    await db.commit()
-    await db.refresh(room)
 
-    return room
+def _created(rooms: list[Room]) -> None:
+    # Replaces any cached "not found" for these codes
+    cache = get_room_cache()
+    if cache is not None:
+        for room in rooms:
+            cache.put(snapshot_room(room))
+
+    _rooms_created.inc(len(rooms))
+
+
+async def _insert_rooms(db: AsyncSession, rooms: list[Room]) -> None:
+    """
+    Insert rooms with one multi-row INSERT ... ON CONFLICT (room_code)
+    DO NOTHING RETURNING id per attempt. Rows that collided get a new code
+    and go into the next attempt, in the same transaction; nothing is
+    read back beyond the ids.
+
+    Raises:
+        RoomCodeExhaustedError: If some rooms found no free code (the
+        transaction is rolled back).
+    """
+    insert = _insert_for(db)
+    pending = rooms
+
+    for _ in range(ROOM_CODE_MAX_ATTEMPTS):
+        # A code drawn twice within one batch counts as a collision too
+        batch: dict[str, Room] = {}
+        collided: list[Room] = []
+
+        for room in pending:
+            room.room_code = _allocator.generate()
+            if room.room_code in batch:
+                collided.append(room)
+            else:
+                batch[room.room_code] = room
+
+        stmt = (
+            insert(Room)
+            .values([
+                {
+                    "id": room.id,
+                    "room_code": room.room_code,
+                    "name": room.name,
+                    "password_hash": room.password_hash,
+                    "created_at": room.created_at,
+                    "expires_at": room.expires_at,
+                }
+                for room in batch.values()
+            ])
+            .on_conflict_do_nothing(index_elements=[Room.room_code])
+            .returning(Room.id)
+        )
+
+        result = await db.execute(stmt)
+        inserted = set(result.scalars())
+
+        collided.extend(room for room in batch.values() if room.id not in inserted)
+        for room in pending:
+            _allocator.record(collided=room.id not in inserted)
+        _code_collisions.inc(len(collided))
+
+        pending = collided
+        if not pending:
+            return
+
+    await db.rollback()
+    raise RoomCodeExhaustedError("Could not allocate a unique room code")
+
+
+class RoomInsertBatcher:
+    """
+    Group commit for single-room creates.
+
+    Callers park on a future while their room waits in the current batch.
+    The batch is written when the window closes or it reaches max_rooms,
+    on its own session from the default pool, with one statement per code
+    attempt and a single commit. If the batch fails as a whole, its rooms
+    are retried one per transaction, so a bad row fails only its own
+    caller.
+    """
+
+    def __init__(self, window_seconds: float, max_rooms: int) -> None:
+        self._window = window_seconds
+        self._max_rooms = max_rooms
+        self._pending: list[tuple[Room, asyncio.Future]] = []
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task] = set()
+
+    async def submit(self, room: Room) -> None:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((room, future))
+
+        if len(self._pending) >= self._max_rooms:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self._window, self._flush)
+
+        await future
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+
+        task = asyncio.create_task(self._write(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _write(self, batch: list[tuple[Room, asyncio.Future]]) -> None:
+        try:
+            await self._insert([room for room, _ in batch])
+        except Exception as exc:
+            if len(batch) == 1:
+                _settle(batch[0][1], exc)
+                return
+        else:
+            for _, future in batch:
+                _settle(future, None)
+            return
+
+        # Isolate the failing row(s); the rest still get their room
+        for room, future in batch:
+            try:
+                await self._insert([room])
+            except Exception as exc:
+                _settle(future, exc)
+            else:
+                _settle(future, None)
+
+    async def _insert(self, rooms: list[Room]) -> None:
+        async with get_sessionmaker()() as db:
+            await _insert_rooms(db, rooms)
+            await db.commit()
+
+
+def _settle(future: asyncio.Future, exc: Exception | None) -> None:
+    # The caller may have been cancelled while the batch was written
+    if future.done():
+        return
+    if exc is None:
+        future.set_result(None)
+    else:
+        future.set_exception(exc)
+
+
+_batcher: RoomInsertBatcher | None = None
+
+
+def _get_batcher() -> RoomInsertBatcher | None:
+    global _batcher
+
+    settings = get_settings().room_create
+
+    if not settings.batch_window_ms:
+        return None
+
+    if _batcher is None:
+        _batcher = RoomInsertBatcher(
+            settings.batch_window_ms / 1000, settings.batch_max_rooms)
+
+    return _batcher
@@ -1,13 +1,20 @@
+import time
+from dataclasses import replace
 from datetime import datetime, timezone
 
-from sqlalchemy import select
+from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
-
+from app.core.metrics import metrics
+from app.core.security import (
+    PasswordHasherBusyError,
+    hash_password_async,
+    needs_rehash,
+    verify_password_async,
+)
 from app.schema.room import Room
 from app.services.join_token_service import generate_join_token
-
-from app.core.security import verify_password
+from app.state.room_cache import CachedRoom, get_room_cache
 
 
 class RoomNotFoundError(Exception):
@@ -22,19 +29,35 @@ class RoomPasswordError(Exception):
     pass
 
 
+_join_seconds = metrics.histogram(
+    "wwi_room_join_seconds", "Time spent joining a room, including password verification")
+_joins = metrics.counter("wwi_room_joins_total", "Room join attempts by outcome", ["outcome"])
+
+# Children bound up front so recording is a single attribute update
+_JOIN_OUTCOMES = {
+    None: _joins.labels("ok"),
+    RoomNotFoundError: _joins.labels("not_found"),
+    RoomExpiredError: _joins.labels("expired"),
+    RoomPasswordError: _joins.labels("bad_password"),
+    PasswordHasherBusyError: _joins.labels("busy"),
+}
+_JOIN_ERROR = _joins.labels("error")
+
+
 async def join_room(
     *,
     db: AsyncSession,
     room_code: str,
     password: str,
-) -> tuple[Room, str, datetime | None]:
+) -> tuple[CachedRoom, str, datetime | None]:
     """
     Join a room by its code and password.
 
     This function performs the following steps:
-    1. Fetch the room by its code.
+    1. Fetch the room by its code (from the room cache when possible).
     2. Check if the room exists, is not expired, and the password is correct.
-    3. Generate and return a join token for the room.
+    3. Upgrade the stored hash if it was made with outdated cost parameters.
+    4. Generate and return a join token for the room.
 
     Raises:
         RoomNotFoundError: If no room with the given code exists.
@@ -42,8 +65,27 @@ async def join_room(
         RoomPasswordError: If the provided password is incorrect.
     """
 
-    result = await db.execute(select(Room).where(Room.room_code == room_code))
-    room: Room | None = result.scalar_one_or_none()
+    start = time.perf_counter()
+    outcome = _JOIN_ERROR
+
+    try:
+        result = await _join_room(db, room_code, password)
+        outcome = _JOIN_OUTCOMES[None]
+        return result
+    except Exception as exc:
+        outcome = _JOIN_OUTCOMES.get(type(exc), _JOIN_ERROR)
+        raise
+    finally:
+        _join_seconds.observe(time.perf_counter() - start)
+        outcome.inc()
+
+
+async def _join_room(
+    db: AsyncSession,
+    room_code: str,
+    password: str,
+) -> tuple[CachedRoom, str, datetime | None]:
+    room = await _get_room(db, room_code)
 
     if not room:
         raise RoomNotFoundError("Room not found")
@@ -51,9 +93,75 @@ async def join_room(
     if room.expires_at and room.expires_at < datetime.now(timezone.utc):
         raise RoomExpiredError("Room has expired")
 
-    if not verify_password(room.password_hash, password):
+    if not await verify_password_async(room.password_hash, password):
         raise RoomPasswordError("Incorrect password")
 
+    if needs_rehash(room.password_hash):
+        room = await _rehash_password(db, room, password)
+
     token, expires_at = generate_join_token(room.id)
 
     return room, token, expires_at
+
+
+async def _get_room(db: AsyncSession, room_code: str) -> CachedRoom | None:
+    """
+    Look a room up by code, serving hits and known misses from memory.
+    """
+    cache = get_room_cache()
+
+    if cache is not None:
+        cached, room = cache.lookup(room_code)
+        if cached:
+            return room
+
+    result = await db.execute(select(Room).where(Room.room_code == room_code))
+    row: Room | None = result.scalar_one_or_none()
+
+    room = snapshot_room(row) if row is not None else None
+
+    if cache is not None:
+        if room is None:
+            cache.put_missing(room_code)
+        else:
+            cache.put(room)
+
+    return room
+
+
+def snapshot_room(room: Room) -> CachedRoom:
+    return CachedRoom(
+        id=room.id,
+        room_code=room.room_code,
+        name=room.name,
+        password_hash=room.password_hash,
+        expires_at=room.expires_at,
+    )
+
+
+async def _rehash_password(
+    db: AsyncSession,
+    room: CachedRoom,
+    password: str,
+) -> CachedRoom:
+    """
+    Re-hash a verified password with the current cost parameters.
+    Best effort: a busy hashing pool just defers the upgrade to a later join.
+    """
+    try:
+        password_hash = await hash_password_async(password)
+    except PasswordHasherBusyError:
+        return room
+
+    await db.execute(
+        update(Room).where(Room.id == room.id).values(password_hash=password_hash)
+    )
+    await db.commit()
+
+    room = replace(room, password_hash=password_hash)
+
+    cache = get_room_cache()
+    if cache is not None:
+        cache.put(room)
+
+    return room
@@ -0,0 +1,91 @@
+import asyncio
+import logging
+from datetime import datetime, timezone
+from uuid import UUID
+
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import ReaperSettings
+from app.core.db import get_sessionmaker
+from app.schema.room import Room
+from app.state.connections import connections
+from app.state.room_cache import get_room_cache
+
+logger = logging.getLogger(__name__)
+
+
+async def reap_expired_rooms(
+    db: AsyncSession,
+    batch_size: int,
+) -> list[tuple[UUID, str]]:
+    """
+    Delete up to batch_size expired rooms and return their (id, room_code).
+
+    Candidate rows are locked with FOR UPDATE SKIP LOCKED, so replicas
+    running the reaper at the same time split the work instead of
+    waiting on each other.
+    """
+
+    now = datetime.now(timezone.utc)
+
+    expired = (
+        select(Room.id)
+        .where(Room.expires_at.is_not(None), Room.expires_at < now)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+
+    result = await db.execute(
+        delete(Room)
+        .where(Room.id.in_(expired.scalar_subquery()))
+        .returning(Room.id, Room.room_code)
+    )
+    reaped = [(row.id, row.room_code) for row in result]
+
+    await db.commit()
+
+    return reaped
+
+
+def forget_rooms(reaped: list[tuple[UUID, str]]) -> None:
+    """
+    Drop in-process state for reaped rooms: cache entries, live sockets
+    and replay history.
+    Runs on the reaping node and, via the backplane, on every other one.
+    """
+    cache = get_room_cache()
+
+    for room_id, room_code in reaped:
+        if cache is not None:
+            cache.invalidate(room_code)
+        connections.close_room(room_id, reason="Room expired")
+
+
+async def run_room_reaper(settings: ReaperSettings) -> None:
+    """
+    Periodically delete expired rooms in bounded batches.
+    Intended to run as a background task for the lifetime of the app.
+    """
+
+    sessionmaker = get_sessionmaker("background")
+
+    while True:
+        try:
+            # Drain full batches back to back, then wait for the next round
+            while True:
+                async with sessionmaker() as db:
+                    reaped = await reap_expired_rooms(db, settings.batch_size)
+
+                forget_rooms(reaped)
+                await connections.announce_rooms_closed(reaped)
+
+                if len(reaped) < settings.batch_size:
+                    break
+
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Room reaper pass failed")
+
+        await asyncio.sleep(settings.interval_seconds)
@@ -0,0 +1,524 @@
+import abc
+import asyncio
+import logging
+import struct
+import uuid
+from typing import Callable
+from uuid import UUID
+
+from app.core.config import BackplaneSettings
+from app.core.protocol import MAX_SLOT
+
+logger = logging.getLogger(__name__)
+
+# Called with (room_id, message) for every message published by another node
+Deliver = Callable[[UUID, str | bytes], None]
+# Called with [(room_id, room_code)] when another node deleted rooms
+RoomsClosed = Callable[[list[tuple[UUID, str]]], None]
+# Called with [room_id] (rooms watched here) when another node just
+# subscribed to them and wants their current members announced
+RosterRequest = Callable[[list[UUID]], None]
+
+# Batch envelope: 16-byte origin node id, then per message a kind byte
+# (text / bytes) and a 4-byte length followed by the payload.
+_NODE_ID_LEN = 16
+_ITEM = struct.Struct("!BI")
+_KIND_TEXT = 0
+_KIND_BYTES = 1
+
+# Control envelope (on the control channel every node subscribes to):
+# origin node id, an event byte, then the event body. ROOMS_CLOSED is a
+# list of 16-byte room id + u8 code length + room code; ROSTER_REQUEST
+# is a list of 16-byte room ids.
+_EVENT_ROOMS_CLOSED = 1
+_EVENT_ROSTER_REQUEST = 2
+_CLOSED_ROOM = struct.Struct("!16sB")
+_ROOM_ID_LEN = 16
+
+
+def encode_batch(node_id: bytes, messages: list[str | bytes]) -> bytes:
+    parts = [node_id]
+
+    for message in messages:
+        if isinstance(message, str):
+            data = message.encode("utf-8")
+            parts.append(_ITEM.pack(_KIND_TEXT, len(data)))
+        else:
+            data = message
+            parts.append(_ITEM.pack(_KIND_BYTES, len(data)))
+        parts.append(data)
+
+    return b"".join(parts)
+
+
+def decode_batch(payload: bytes) -> tuple[bytes, list[str | bytes]]:
+    node_id = payload[:_NODE_ID_LEN]
+    view = memoryview(payload)
+    offset = _NODE_ID_LEN
+    messages: list[str | bytes] = []
+
+    while offset < len(payload):
+        kind, length = _ITEM.unpack_from(payload, offset)
+        offset += _ITEM.size
+        data = bytes(view[offset:offset + length])
+        offset += length
+        messages.append(data.decode("utf-8") if kind == _KIND_TEXT else data)
+
+    return node_id, messages
+
+
+def encode_rooms_closed(node_id: bytes, rooms: list[tuple[UUID, str]]) -> bytes:
+    parts = [node_id, bytes([_EVENT_ROOMS_CLOSED])]
+
+    for room_id, room_code in rooms:
+        code = room_code.encode("ascii")
+        parts.append(_CLOSED_ROOM.pack(room_id.bytes, len(code)))
+        parts.append(code)
+
+    return b"".join(parts)
+
+
+def decode_rooms_closed(payload: bytes) -> list[tuple[UUID, str]]:
+    offset = _NODE_ID_LEN + 1
+    rooms = []
+
+    while offset < len(payload):
+        room_id, length = _CLOSED_ROOM.unpack_from(payload, offset)
+        offset += _CLOSED_ROOM.size
+        rooms.append((UUID(bytes=room_id), payload[offset:offset + length].decode("ascii")))
+        offset += length
+
+    return rooms
+
+
+def encode_roster_request(node_id: bytes, room_ids: list[UUID]) -> bytes:
+    return b"".join([node_id, bytes([_EVENT_ROSTER_REQUEST])] + [r.bytes for r in room_ids])
+
+
+def decode_roster_request(payload: bytes) -> list[UUID]:
+    return [
+        UUID(bytes=payload[offset:offset + _ROOM_ID_LEN])
+        for offset in range(_NODE_ID_LEN + 1, len(payload), _ROOM_ID_LEN)
+    ]
+
+
+_NO_FREE_INDEX = "All %d backplane node indexes are taken; raise backplane.max_nodes"
+
+# Node index leases on Redis: claimed with SET NX, kept alive while the
+# node runs, and only ever refreshed or released by their owner
+_LEASE_SECONDS = 30
+_REFRESH_LEASE = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+_RELEASE_LEASE = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class Backplane(abc.ABC):
+    """
+    Relays room messages between processes.
+
+    Outgoing messages are grouped per room and published as one envelope
+    per batch window, unless the transport knows nobody else is listening.
+    A node only subscribes to rooms it has local members in (see watch /
+    unwatch), and drops its own envelopes by their header alone.
+
+    Every node also listens on one control channel for room lifecycle
+    events, e.g. rooms deleted by another node's reaper, and for roster
+    requests: after subscribing to new rooms a node asks the others to
+    announce their members there, so its roster starts out complete.
+
+    Each node leases one of max_nodes node indexes at start and hands out
+    sender slots only from that index's block (slot_range), so slots in a
+    room are unique across nodes without any per-join coordination.
+
+    Subclasses provide the transport: _send, _sync_subscriptions and
+    _lease_node_index (plus _connect if they hold a connection), and hand
+    everything received to _dispatch.
+    """
+
+    def __init__(self, settings: BackplaneSettings) -> None:
+        self.node_id = uuid.uuid4().bytes
+        self._prefix = settings.channel_prefix
+        self._control_channel = f"{settings.channel_prefix}control"
+        self._max_nodes = settings.max_nodes
+        self.node_index: int | None = None
+        self._interval = settings.batch_interval_ms / 1000
+        self._max_batch = settings.batch_max_messages
+
+        self._deliver: Deliver | None = None
+        self._on_rooms_closed: RoomsClosed | None = None
+        self._on_roster_request: RosterRequest | None = None
+        self._rooms: set[UUID] = set()
+        self._subscribed_rooms: set[UUID] = set()
+        self._pending: dict[UUID, list[str | bytes]] = {}
+        self._flush_wanted = asyncio.Event()
+        self._subscriptions_changed = asyncio.Event()
+        self._tasks: list[asyncio.Task] = []
+
+    # ---- lifecycle ----
+
+    async def start(
+        self,
+        deliver: Deliver,
+        on_rooms_closed: RoomsClosed | None = None,
+        on_roster_request: RosterRequest | None = None,
+    ) -> None:
+        self._deliver = deliver
+        self._on_rooms_closed = on_rooms_closed
+        self._on_roster_request = on_roster_request
+        await self._connect()
+        self.node_index = await self._lease_node_index()
+        # Subscribes to the control channel straight away
+        self._subscriptions_changed.set()
+        self._tasks.append(asyncio.create_task(self._flush_loop()))
+        self._tasks.append(asyncio.create_task(self._subscription_loop()))
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+
+        # Best effort: don't lose what was queued right before shutdown
+        await self._flush()
+
+    # ---- local side ----
+
+    def publish(self, room_id: UUID, message: str | bytes) -> None:
+        """
+        Queue a message for other nodes. Never blocks.
+        """
+        if not self._has_peers(room_id):
+            return
+
+        batch = self._pending.setdefault(room_id, [])
+        batch.append(message)
+        self._flush_wanted.set()
+
+    def watch(self, room_id: UUID) -> None:
+        """
+        Start receiving messages for a room (first local member joined).
+        """
+        self._rooms.add(room_id)
+        self._subscriptions_changed.set()
+
+    def unwatch(self, room_id: UUID) -> None:
+        """
+        Stop receiving messages for a room (last local member left).
+        """
+        self._rooms.discard(room_id)
+        self._subscriptions_changed.set()
+
+    async def announce_rooms_closed(self, rooms: list[tuple[UUID, str]]) -> None:
+        """
+        Tell other nodes these rooms are gone, so they close their sockets
+        and drop cached lookups. Sent at once rather than batched.
+        """
+        if not rooms:
+            return
+
+        try:
+            await self._send(self._control_channel, encode_rooms_closed(self.node_id, rooms))
+        except Exception:
+            logger.exception("Backplane room-closed announcement failed")
+
+    @property
+    def slot_range(self) -> tuple[int, int]:
+        """
+        First and last sender slot this node may assign (valid once started).
+        """
+        per_node = MAX_SLOT // self._max_nodes
+        first = self.node_index * per_node + 1
+        return first, first + per_node - 1
+
+    def channel(self, room_id: UUID) -> str:
+        return f"{self._prefix}{room_id}"
+
+    def room_for_channel(self, channel: str) -> UUID:
+        return UUID(channel[len(self._prefix):])
+
+    # ---- remote side ----
+
+    def _dispatch(self, channel: str, payload: bytes) -> None:
+        if channel == self._control_channel:
+            self._receive_control(payload)
+        else:
+            self._receive(self.room_for_channel(channel), payload)
+
+    def _receive_control(self, payload: bytes) -> None:
+        if payload[:_NODE_ID_LEN] == self.node_id or len(payload) <= _NODE_ID_LEN:
+            return
+
+        event = payload[_NODE_ID_LEN]
+
+        if event == _EVENT_ROOMS_CLOSED and self._on_rooms_closed is not None:
+            self._on_rooms_closed(decode_rooms_closed(payload))
+        elif event == _EVENT_ROSTER_REQUEST and self._on_roster_request is not None:
+            rooms = [r for r in decode_roster_request(payload) if r in self._rooms]
+            if rooms:
+                self._on_roster_request(rooms)
+
+    def _receive(self, room_id: UUID, payload: bytes) -> None:
+        # Checked before decoding: our own envelopes come back on every
+        # channel we publish to
+        if payload[:_NODE_ID_LEN] == self.node_id or room_id not in self._rooms:
+            return
+
+        _, messages = decode_batch(payload)
+
+        for message in messages:
+            self._deliver(room_id, message)
+
+    # ---- background loops ----
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await self._flush_wanted.wait()
+            self._flush_wanted.clear()
+
+            full = any(len(b) >= self._max_batch for b in self._pending.values())
+            if self._interval and not full:
+                await asyncio.sleep(self._interval)
+
+            await self._flush()
+
+    async def _flush(self) -> None:
+        pending, self._pending = self._pending, {}
+
+        for room_id, messages in pending.items():
+            for start in range(0, len(messages), self._max_batch):
+                payload = encode_batch(
+                    self.node_id, messages[start:start + self._max_batch])
+                try:
+                    await self._send(self.channel(room_id), payload)
+                except Exception:
+                    logger.exception("Backplane publish failed for room %s", room_id)
+
+    async def _subscription_loop(self) -> None:
+        while True:
+            await self._subscriptions_changed.wait()
+            self._subscriptions_changed.clear()
+
+            rooms = set(self._rooms)
+            try:
+                await self._sync_subscriptions(
+                    {self._control_channel} | {self.channel(r) for r in rooms})
+            except Exception:
+                logger.exception("Backplane subscription update failed")
+                await asyncio.sleep(1)
+                self._subscriptions_changed.set()
+                continue
+
+            added = rooms - self._subscribed_rooms
+            self._subscribed_rooms = rooms
+            if added:
+                try:
+                    await self._send(
+                        self._control_channel,
+                        encode_roster_request(self.node_id, list(added)))
+                except Exception:
+                    logger.exception("Backplane roster request failed")
+
+    # ---- transport ----
+
+    def _has_peers(self, room_id: UUID) -> bool:
+        """
+        False only if no other node can be subscribed to the room.
+        """
+        return True
+
+    async def _connect(self) -> None:
+        pass
+
+    @abc.abstractmethod
+    async def _lease_node_index(self) -> int:
+        """
+        Claim a node index in [0, max_nodes) no other live node holds.
+        """
+
+    @abc.abstractmethod
+    async def _send(self, channel: str, payload: bytes) -> None:
+        ...
+
+    @abc.abstractmethod
+    async def _sync_subscriptions(self, channels: set[str]) -> None:
+        ...
+
+
+class InMemoryBackplane(Backplane):
+    """
+    Backplane whose "network" is a dict shared by instances in one process.
+
+    Several instances sharing a hub behave like separate nodes; useful for
+    exercising multi-node behaviour without Redis.
+    """
+
+    _default_hub: dict[str, set["InMemoryBackplane"]] = {}
+
+    def __init__(
+        self,
+        settings: BackplaneSettings,
+        hub: dict[str, set["InMemoryBackplane"]] | None = None,
+    ) -> None:
+        super().__init__(settings)
+        self._hub = self._default_hub if hub is None else hub
+        self._channels: set[str] = set()
+
+    def _has_peers(self, room_id: UUID) -> bool:
+        nodes = self._hub.get(self.channel(room_id), ())
+        return any(node is not self for node in nodes)
+
+    async def _lease_node_index(self) -> int:
+        # Every started node is on the control channel; joining it here
+        # (no await in between) makes the claim atomic
+        nodes = self._hub.get(self._control_channel, set())
+        taken = {node.node_index for node in nodes}
+        free = [i for i in range(self._max_nodes) if i not in taken]
+        if not free:
+            raise RuntimeError(_NO_FREE_INDEX % self._max_nodes)
+
+        await self._sync_subscriptions({self._control_channel})
+        return free[0]
+
+    async def _send(self, channel: str, payload: bytes) -> None:
+        for node in tuple(self._hub.get(channel, ())):
+            node._dispatch(channel, payload)
+
+    async def _sync_subscriptions(self, channels: set[str]) -> None:
+        for channel in channels - self._channels:
+            self._hub.setdefault(channel, set()).add(self)
+
+        for channel in self._channels - channels:
+            nodes = self._hub.get(channel)
+            if nodes is not None:
+                nodes.discard(self)
+                if not nodes:
+                    del self._hub[channel]
+
+        self._channels = channels
+
+    async def stop(self) -> None:
+        await super().stop()
+        await self._sync_subscriptions(set())
+
+
+class RedisBackplane(Backplane):
+    """
+    Backplane over Redis pub/sub (any server speaking the Redis protocol).
+    """
+
+    def __init__(self, settings: BackplaneSettings) -> None:
+        super().__init__(settings)
+        self._url = settings.redis_url
+        self._client = None
+        self._pubsub = None
+        self._channels: set[str] = set()
+        self._connected = asyncio.Event()
+        self._lease_key: str | None = None
+
+    async def _connect(self) -> None:
+        try:
+            from redis import asyncio as aioredis
+        except ImportError as exc:
+            raise RuntimeError(
+                "Redis backplane requires the 'redis' extra "
+                "(pip install 'who-was-i-backend[redis]')"
+            ) from exc
+
+        self._client = aioredis.from_url(self._url)
+        self._pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+        self._tasks.append(asyncio.create_task(self._read_loop()))
+
+    async def stop(self) -> None:
+        await super().stop()
+
+        if self._lease_key is not None:
+            try:
+                await self._client.eval(_RELEASE_LEASE, 1, self._lease_key, self.node_id)
+            except Exception:
+                logger.warning("Could not release backplane node index", exc_info=True)
+            self._lease_key = None
+
+        if self._pubsub is not None:
+            await self._pubsub.aclose()
+        if self._client is not None:
+            await self._client.aclose()
+
+    async def _send(self, channel: str, payload: bytes) -> None:
+        await self._client.publish(channel, payload)
+
+    async def _lease_node_index(self) -> int:
+        for index in range(self._max_nodes):
+            key = f"{self._prefix}node:{index}"
+            if await self._client.set(key, self.node_id, nx=True, ex=_LEASE_SECONDS):
+                self._lease_key = key
+                self._tasks.append(asyncio.create_task(self._keep_lease(key)))
+                return index
+
+        raise RuntimeError(_NO_FREE_INDEX % self._max_nodes)
+
+    async def _keep_lease(self, key: str) -> None:
+        while True:
+            await asyncio.sleep(_LEASE_SECONDS / 3)
+            try:
+                kept = await self._client.eval(
+                    _REFRESH_LEASE, 1, key, self.node_id, _LEASE_SECONDS * 1000)
+                # Expired during a Redis outage: take it back if still free
+                if not kept and not await self._client.set(
+                    key, self.node_id, nx=True, ex=_LEASE_SECONDS,
+                ):
+                    logger.error("Backplane node index %s taken over by another node; "
+                                 "sender slots may collide", key)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.warning("Backplane node index refresh failed", exc_info=True)
+
+    async def _sync_subscriptions(self, channels: set[str]) -> None:
+        added = channels - self._channels
+        removed = self._channels - channels
+
+        if added:
+            await self._pubsub.subscribe(*added)
+            self._connected.set()
+        if removed:
+            await self._pubsub.unsubscribe(*removed)
+
+        self._channels = channels
+
+    async def _read_loop(self) -> None:
+        # The pubsub connection only exists after the first subscribe
+        await self._connected.wait()
+
+        while True:
+            try:
+                message = await self._pubsub.get_message(timeout=1.0)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Backplane read failed")
+                await asyncio.sleep(1)
+                continue
+
+            if message is None or message["type"] != "message":
+                continue
+
+            self._dispatch(message["channel"].decode("utf-8"), message["data"])
+
+
+def create_backplane(settings: BackplaneSettings) -> Backplane | None:
+    """
+    The configured transport, or None for "memory": fan-out stays inside
+    this process and broadcasts skip the backplane entirely.
+    """
+    if settings.backend == "redis":
+        return RedisBackplane(settings)
+    return None
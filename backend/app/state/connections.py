@@ -1,36 +1,834 @@
-from typing import Set
-from fastapi import WebSocket
+import asyncio
+import time
+from collections import OrderedDict, deque
+from typing import Any, Mapping
+from uuid import UUID
+
+from fastapi import WebSocket, status
+
+from app.core.compression import StreamDeflater, deflate_frame
+from app.core.config import WebSocketSettings, get_settings
+from app.core.metrics import metrics
+from app.core.protocol import HEADER_SIZE, MAX_SLOT, SEQUENCE, FrameType, encode_frame
+from app.state.backplane import Backplane
+from app.state.presence import RoomPresence
+from app.state.replay import get_replay_store
+
+
+class RoomFullError(Exception):
+    pass
+
+
+_frames_queued = metrics.counter(
+    "wwi_ws_frames_queued_total", "Frames queued to local sockets by room broadcasts")
+_evictions = metrics.counter(
+    "wwi_ws_evictions_total", "Sockets closed as slow consumers")
+
+
+class Connection:
+    """
+    A registered WebSocket plus its bounded outbound buffer.
+
+    Every connection owns a writer task that drains the buffer, so a
+    broadcast never awaits a socket: it only appends. When the buffer
+    crosses its high-water mark (frames or bytes) the slow-consumer policy
+    decides what gives:
+
+    - disconnect: the connection is evicted
+    - drop_oldest: the oldest queued frames are discarded
+    - coalesce: runs of queued binary frames are merged into one send
+      each (frames are self-delimiting); still over either limit -> evict
+
+    With per-connection compression the writer deflates binary frames
+    through this socket's own context just before sending.
+    """
+
+    __slots__ = (
+        "websocket", "room_id", "slot", "dropped", "deflater",
+        "_buffer", "_buffered_bytes", "_mergeable", "_wakeup", "_idle",
+        "_writer", "_max_frames", "_max_bytes", "_policy",
+    )
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        room_id: UUID,
+        slot: int,
+        settings: WebSocketSettings,
+        deflater: StreamDeflater | None = None,
+    ) -> None:
+        self.websocket = websocket
+        self.room_id = room_id
+        self.slot = slot
+        self.dropped = 0
+        self.deflater = deflater
+
+        self._buffer: deque[tuple[Mapping[str, Any], int]] = deque()
+        self._buffered_bytes = 0
+        # Queued binary frames directly behind another binary frame, i.e.
+        # how many sends coalescing would save
+        self._mergeable = 0
+        self._wakeup = asyncio.Event()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._max_frames = settings.send_queue_size
+        self._max_bytes = settings.send_queue_high_water_bytes
+        self._policy = settings.slow_consumer_policy
+
+        self._writer = asyncio.create_task(self._write_loop())
+
+    def enqueue(self, message: Mapping[str, Any], size: int) -> bool:
+        """
+        Queue an ASGI send message without waiting.
+        Returns False if the connection should be evicted.
+        """
+        if self._buffer and _is_binary(message) and _is_binary(self._buffer[-1][0]):
+            self._mergeable += 1
+
+        self._buffer.append((message, size))
+        self._buffered_bytes += size
+        self._wakeup.set()
+        self._idle.clear()
+
+        if self._over_high_water():
+            return self._relieve()
+        return True
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._buffer)
+
+    @property
+    def queued_bytes(self) -> int:
+        return self._buffered_bytes
+
+    @property
+    def compression_memory(self) -> int:
+        return self.deflater.memory if self.deflater is not None else 0
+
+    def _over_high_water(self) -> bool:
+        return (
+            len(self._buffer) > self._max_frames
+            or self._buffered_bytes > self._max_bytes
+        )
+
+    def _relieve(self) -> bool:
+        if self._policy == "drop_oldest":
+            while len(self._buffer) > 1 and self._over_high_water():
+                self._popleft()
+                self.dropped += 1
+            return True
+
+        if self._policy == "coalesce":
+            # Merging saves sends, not bytes
+            if self._buffered_bytes > self._max_bytes:
+                return False
+            # Only worth a pass over the queue if it frees at least a
+            # quarter of the frame budget, which keeps enqueue amortised
+            # O(1); text frames never merge, so a queue of them is evicted
+            if len(self._buffer) - self._mergeable <= max(1, self._max_frames * 3 // 4):
+                self._coalesce()
+            return len(self._buffer) <= self._max_frames
+
+        return False
+
+    def _popleft(self) -> tuple[Mapping[str, Any], int]:
+        message, size = self._buffer.popleft()
+        self._buffered_bytes -= size
+
+        if self._mergeable and _is_binary(message) and _is_binary(self._buffer[0][0]):
+            self._mergeable -= 1
+
+        return message, size
+
+    def _coalesce(self) -> None:
+        merged: deque[tuple[Mapping[str, Any], int]] = deque()
+        run: list[bytes] = []
+
+        def flush_run() -> None:
+            if run:
+                data = run[0] if len(run) == 1 else b"".join(run)
+                merged.append(({"type": "websocket.send", "bytes": data}, len(data)))
+                run.clear()
+
+        for message, size in self._buffer:
+            data = message.get("bytes")
+            if data is not None:
+                run.append(data)
+            else:
+                flush_run()
+                merged.append((message, size))
+        flush_run()
+
+        self._buffer = merged
+        self._mergeable = 0
+
+    async def _write_loop(self) -> None:
+        send = self.websocket.send
+
+        try:
+            while True:
+                if not self._buffer:
+                    self._idle.set()
+                    self._wakeup.clear()
+                    await self._wakeup.wait()
+                    continue
+
+                message, _ = self._popleft()
+
+                if self.deflater is not None and message.get("bytes"):
+                    message = {
+                        "type": "websocket.send",
+                        "bytes": self.deflater.deflate_frames(message["bytes"]),
+                    }
+
+                await send(message)
+        except Exception:
+            # Socket went away; the receive loop will unregister it
+            pass
+        finally:
+            self._idle.set()
+
+    async def flush(self, timeout: float) -> bool:
+        """
+        Wait until everything queued so far has been written.
+        Returns False if the timeout expired first or nothing is left to
+        write it (the writer stopped because the socket went away).
+        """
+        if self._writer.done():
+            return not self._buffer
+
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+    def close(self) -> None:
+        self._writer.cancel()
+
+
+def _is_binary(message: Mapping[str, Any]) -> bool:
+    return message.get("bytes") is not None
+
+
+class _SlotPool:
+    """
+    Sender slots of one room on this process.
+
+    A released slot is quarantined before anyone else gets it: held,
+    replayed or relayed frames may still carry it, and clients skip
+    MESSAGE frames carrying their own slot. Reuse is FIFO, so the slot
+    handed out is always the one free the longest.
+    """
+
+    __slots__ = ("_next", "_last", "_quarantine", "_released")
+
+    def __init__(self, first: int, last: int, quarantine: float) -> None:
+        self._next = first
+        # Multi-node: the block this node leased from the backplane
+        self._last = last
+        self._quarantine = quarantine
+        # (slot, monotonic time it may be reused)
+        self._released: deque[tuple[int, float]] = deque()
+
+    def acquire(self, now: float) -> int:
+        if self._released and self._released[0][1] <= now:
+            return self._released.popleft()[0]
+        if self._next > self._last:
+            raise RoomFullError("No free sender slots in room")
+        slot = self._next
+        self._next += 1
+        return slot
+
+    def release(self, slot: int, now: float) -> None:
+        self._released.append((slot, now + self._quarantine))
+
+    @property
+    def settled_at(self) -> float:
+        """
+        When the last quarantine lapses (a fresh pool would then do).
+        """
+        return self._released[-1][1] if self._released else 0.0
+
+
+def _slot_quarantine(settings: WebSocketSettings) -> float:
+    """
+    How long a released slot may still show up in frames sent to clients.
+    """
+    quarantine = settings.coalesce_window_ms / 1000
+    if settings.replay.enabled:
+        quarantine += settings.replay.max_age_seconds
+    return quarantine
+
+
+class _Room:
+    """
+    Local members of one room, their sender slots and roster, and binary
+    frames waiting for the coalescing window to close.
+    """
+
+    __slots__ = (
+        "members", "presence", "pending", "pending_bytes", "pending_seq",
+        "flush_handle", "slots",
+    )
+
+    def __init__(self, slots: _SlotPool) -> None:
+        self.members: dict[WebSocket, Connection] = {}
+        self.presence = RoomPresence()
+        self.pending: list[bytes] = []
+        self.pending_bytes = 0
+        # Sequence number of the first held frame (replay enabled only)
+        self.pending_seq: int | None = None
+        self.flush_handle: asyncio.TimerHandle | None = None
+        self.slots = slots
 
 
 class ConnectionRegistry:
     """
     In-memory registry for active WebSocket connections.
 
-    Phase 1 responsibilities:
-    - track connect / disconnect
-    - expose current connections
-    - nothing else
+    Responsibilities:
+    - track connect / disconnect, indexed by room
+    - fan a message out to every member of one room
+    - forward room traffic to other processes through the backplane
+
+    Broadcast cost scales with the size of the room, never with the
+    total number of sockets in the process.
 
     This state is intentionally ephemeral.
     """
 
     def __init__(self) -> None:
-        self._connections: Set[WebSocket] = set()
+        self._rooms: dict[UUID, _Room] = {}
+        self._connections: dict[WebSocket, Connection] = {}
+        self._backplane: Backplane | None = None
+        # Slot pools of rooms that emptied while some slots were still
+        # quarantined, in the order they emptied
+        self._idle_slots: OrderedDict[UUID, _SlotPool] = OrderedDict()
+        self._compression_memory = 0
+        # Closes started by close_room / _evict, which don't wait for them
+        self._closing: set[asyncio.Task] = set()
+        self.draining = False
+
+    def attach_backplane(self, backplane: Backplane | None) -> None:
+        """
+        Relay broadcasts through a backplane (None to detach).
+        Rooms that already have members are watched immediately.
+        """
+        self._backplane = backplane
 
-    async def connect(self, websocket: WebSocket) -> None:
+        if backplane is not None:
+            for room_id in self._rooms:
+                backplane.watch(room_id)
+
+    async def connect(self, websocket: WebSocket, room_id: UUID) -> Connection:
         await websocket.accept()
-        self._connections.add(websocket)
+        return self.register(websocket, room_id)
+
+    def register(self, websocket: WebSocket, room_id: UUID, name: str = "") -> Connection:
+        """
+        Attach an already-accepted socket to a room under a display name.
+        The socket gets the roster with the next presence batch.
+        Raises RoomFullError if the room has no free sender slots.
+        """
+        settings = get_settings().websocket
+        now = time.monotonic()
+
+        room = self._rooms.get(room_id)
+        if room is None:
+            room = self._rooms[room_id] = _Room(self._slot_pool(room_id, settings))
+            if self._backplane is not None:
+                self._backplane.watch(room_id)
+
+        try:
+            slot = room.slots.acquire(now)
+        except RoomFullError:
+            self._drop_if_empty(room_id, room)
+            raise
+
+        deflater = self._new_deflater(settings)
+        connection = Connection(websocket, room_id, slot, settings, deflater)
+
+        self._connections[websocket] = connection
+        room.members[websocket] = connection
+
+        room.presence.join(connection, name)
+        self._schedule_presence(room_id, room)
+
+        return connection
 
     def disconnect(self, websocket: WebSocket) -> None:
-        self._connections.discard(websocket)
+        connection = self._connections.pop(websocket, None)
+        if connection is None:
+            return
+
+        connection.close()
+        self._compression_memory -= connection.compression_memory
+
+        room = self._rooms.get(connection.room_id)
+        if room is not None:
+            room.members.pop(websocket, None)
+            room.slots.release(connection.slot, time.monotonic())
+            room.presence.leave(connection.slot)
+
+            if room.members:
+                self._schedule_presence(connection.room_id, room)
+            else:
+                self._drop_if_empty(connection.room_id, room)
+
+    def _slot_pool(self, room_id: UUID, settings: WebSocketSettings) -> _SlotPool:
+        """
+        The room's pool from when it last emptied, if slots released then
+        are still quarantined; otherwise a fresh one.
+        """
+        pool = self._idle_slots.pop(room_id, None)
+        if pool is not None:
+            return pool
+
+        first, last = self._backplane.slot_range if self._backplane else (1, MAX_SLOT)
+        return _SlotPool(first, last, _slot_quarantine(settings))
+
+    def rename(self, connection: Connection, name: str) -> None:
+        room = self._rooms.get(connection.room_id)
+        if room is None:
+            return
+
+        room.presence.rename(connection.slot, name)
+        self._schedule_presence(connection.room_id, room)
+
+    def _schedule_presence(self, room_id: UUID, room: _Room) -> None:
+        presence = room.presence
+
+        if presence.flush_handle is None and presence.has_pending:
+            window = get_settings().websocket.presence_batch_ms / 1000
+            presence.flush_handle = asyncio.get_running_loop().call_later(
+                window, self._flush_presence, room_id)
+
+    def _flush_presence(self, room_id: UUID) -> None:
+        """
+        Announce one presence batch: a shared ROSTER snapshot for sockets
+        admitted during the batch, one shared PRESENCE delta for the rest.
+        """
+        room = self._rooms.get(room_id)
+        if room is None:
+            return
+
+        room.presence.flush_handle = None
+        snapshot, delta, joiners = room.presence.take_batch()
+
+        queued = 0
+        slow: list[Connection] = []
+        fresh: set[WebSocket] = set()
+
+        if snapshot is not None:
+            frame = encode_frame(FrameType.ROSTER, 0, room_id, snapshot)
+            message = {"type": "websocket.send", "bytes": frame}
+
+            for connection in joiners:
+                # Skip sockets that already left again
+                if room.members.get(connection.websocket) is not connection:
+                    continue
+                fresh.add(connection.websocket)
+                if connection.enqueue(message, len(frame)):
+                    queued += 1
+                else:
+                    slow.append(connection)
+
+        if delta is not None:
+            frame = encode_frame(FrameType.PRESENCE, 0, room_id, delta)
+            message = {"type": "websocket.send", "bytes": frame}
+
+            if self._backplane is not None:
+                self._backplane.publish(room_id, frame)
+
+            for websocket, connection in room.members.items():
+                if websocket in fresh:
+                    continue
+                if connection.enqueue(message, len(frame)):
+                    queued += 1
+                else:
+                    slow.append(connection)
+
+        _frames_queued.inc(queued)
+
+        for connection in slow:
+            self._evict(connection)
+
+    def _new_deflater(self, settings: WebSocketSettings) -> StreamDeflater | None:
+        """
+        Per-connection deflate context, if enabled and within the memory cap.
+        """
+        compression = settings.compression
+
+        if not compression.enabled or compression.context != "per_connection":
+            return None
+
+        deflater = StreamDeflater(
+            level=compression.level,
+            window_bits=compression.window_bits,
+            mem_level=compression.mem_level,
+            min_bytes=compression.min_bytes,
+        )
+
+        if self._compression_memory + deflater.memory > compression.max_memory_bytes:
+            return None
+
+        self._compression_memory += deflater.memory
+        return deflater
+
+    def _drop_if_empty(self, room_id: UUID, room: _Room) -> None:
+        if room.members:
+            return
+
+        if room.flush_handle is not None:
+            room.flush_handle.cancel()
+        if room.presence.flush_handle is not None:
+            room.presence.flush_handle.cancel()
+
+        del self._rooms[room_id]
+
+        now = time.monotonic()
+        idle = self._idle_slots
+        while idle and next(iter(idle.values())).settled_at <= now:
+            idle.popitem(last=False)
+        if room.slots.settled_at > now:
+            idle[room_id] = room.slots
+
+        if self._backplane is not None:
+            # Nobody is left here to tell, but other nodes' rosters still
+            # list the members that just went
+            _, delta, _ = room.presence.take_batch()
+            if delta is not None:
+                self._backplane.publish(
+                    room_id, encode_frame(FrameType.PRESENCE, 0, room_id, delta))
+            self._backplane.unwatch(room_id)
+
+    def broadcast(
+        self,
+        room_id: UUID,
+        data: str | bytes,
+        *,
+        exclude: WebSocket | None = None,
+    ) -> int:
+        """
+        Send one message to every member of a room, on every process.
+
+        Local members are served directly; other processes get the message
+        through the backplane. With shared compression a binary frame is
+        deflated here, once, before it reaches any recipient or the
+        backplane. Returns the number of local sockets the message was
+        queued for.
+        """
+        if isinstance(data, bytes):
+            compression = get_settings().websocket.compression
+            if compression.enabled and compression.context == "shared":
+                data = deflate_frame(
+                    data, level=compression.level, min_bytes=compression.min_bytes)
+
+        if self._backplane is not None:
+            self._backplane.publish(room_id, data)
+
+        return self.deliver_local(room_id, data, exclude=exclude)
+
+    def deliver_local(
+        self,
+        room_id: UUID,
+        data: str | bytes,
+        *,
+        exclude: WebSocket | None = None,
+    ) -> int:
+        """
+        Send one message to the members of a room on this process.
+
+        The ASGI message is built once and shared by all recipients, and
+        binary payloads are passed through untouched. With coalescing on,
+        binary frames are held briefly and sent in batches (see
+        _flush_pending), exclude included; the return value then counts
+        intended recipients.
+        Members whose queue is full are evicted as slow consumers.
+        Returns the number of sockets the message was queued for.
+        """
+        room = self._rooms.get(room_id)
+        if room is None:
+            return 0
+
+        if isinstance(data, str):
+            # Keep ordering with any binary frames still being held
+            if room.pending:
+                self._flush_pending(room_id)
+            message = {"type": "websocket.send", "text": data}
+            return self._fan_out(room, message, len(data), exclude)
+
+        seq = None
+        replay = get_replay_store()
+        if replay is not None and data[0] == FrameType.MESSAGE:
+            seq, data = replay.append(room_id, data)
+
+        settings = get_settings().websocket
+        if not settings.coalesce_window_ms:
+            message = {"type": "websocket.send", "bytes": data}
+            return self._fan_out(room, message, len(data), exclude)
+
+        if not room.pending:
+            room.pending_seq = seq
+        room.pending.append(data)
+        room.pending_bytes += len(data)
+
+        if room.pending_bytes >= settings.coalesce_max_bytes:
+            self._flush_pending(room_id)
+        elif room.flush_handle is None:
+            room.flush_handle = asyncio.get_running_loop().call_later(
+                settings.coalesce_window_ms / 1000, self._flush_pending, room_id)
+
+        return len(room.members) - (exclude in room.members)
+
+    def deliver_remote(self, room_id: UUID, data: str | bytes) -> int:
+        """
+        deliver_local for messages relayed by the backplane; presence
+        deltas from other nodes are folded into the local roster first.
+        """
+        if isinstance(data, bytes) and data[0] == FrameType.PRESENCE:
+            room = self._rooms.get(room_id)
+            if room is not None:
+                room.presence.apply_remote(data[HEADER_SIZE:])
+
+        return self.deliver_local(room_id, data)
+
+    def publish_rosters(self, room_ids: list[UUID]) -> None:
+        """
+        Announce this process's members of these rooms to the other
+        processes, as a PRESENCE delta listing them all as joined.
+        """
+        if self._backplane is None:
+            return
+
+        for room_id in room_ids:
+            room = self._rooms.get(room_id)
+            if room is None or not room.members:
+                continue
+
+            delta = room.presence.joined_delta(c.slot for c in room.members.values())
+            self._backplane.publish(
+                room_id, encode_frame(FrameType.PRESENCE, 0, room_id, delta))
+
+    def _flush_pending(self, room_id: UUID) -> None:
+        """
+        Send a room's held binary frames as one concatenated frame, built
+        once and shared by every member. Envelopes are self-delimiting,
+        so clients split them by header length.
+
+        Authors get their own frames back too, rather than a per-author
+        copy without them (which costs a join of the whole batch per
+        author); clients skip envelopes carrying their own sender slot.
+        """
+        room = self._rooms.get(room_id)
+        if room is None:
+            return
+
+        if room.flush_handle is not None:
+            room.flush_handle.cancel()
+            room.flush_handle = None
+
+        pending = room.pending
+        room.pending = []
+        room.pending_bytes = 0
+        room.pending_seq = None
+
+        if not pending:
+            return
+
+        joined = b"".join(pending)
+        self._fan_out(room, {"type": "websocket.send", "bytes": joined}, len(joined), None)
+
+    def _fan_out(
+        self,
+        room: _Room,
+        message: Mapping[str, Any],
+        size: int,
+        exclude: WebSocket | None,
+    ) -> int:
+        delivered = 0
+        slow: list[Connection] = []
+
+        for websocket, connection in room.members.items():
+            if websocket is exclude:
+                continue
+            if connection.enqueue(message, size):
+                delivered += 1
+            else:
+                slow.append(connection)
+
+        _frames_queued.inc(delivered)
+
+        for connection in slow:
+            self._evict(connection)
+
+        return delivered
+
+    def replay(self, connection: Connection, since: int) -> int:
+        """
+        Queue the room's held MESSAGE frames after sequence since, as one
+        concatenated frame. Frames still waiting for the coalescing window
+        are left out; the socket gets those with everyone else. Preceded
+        by HISTORY_GAP if some of the requested frames are gone.
+        Returns the number of frames replayed.
+        """
+        store = get_replay_store()
+        if store is None:
+            return 0
+
+        room_id = connection.room_id
+        room = self._rooms.get(room_id)
+        until = room.pending_seq if room is not None and room.pending else None
+
+        complete, oldest, frames = store.since(room_id, since, until)
+
+        if not complete:
+            gap = encode_frame(FrameType.HISTORY_GAP, 0, room_id, SEQUENCE.pack(oldest))
+            frames.insert(0, gap)
+
+        if not frames:
+            return 0
+
+        data = b"".join(frames)
+        if not connection.enqueue({"type": "websocket.send", "bytes": data}, len(data)):
+            self._evict(connection)
+
+        return len(frames) - (not complete)
+
+    async def announce_rooms_closed(self, rooms: list[tuple[UUID, str]]) -> None:
+        """
+        Have other processes close their sockets in these (room_id,
+        room_code) rooms too. No-op without a backplane.
+        """
+        if self._backplane is not None:
+            await self._backplane.announce_rooms_closed(rooms)
+
+    def close_room(self, room_id: UUID, reason: str = "") -> int:
+        """
+        Unregister and close every socket in a room, and drop what this
+        process still keeps for it (replay ring, quarantined slots).
+        Returns the number of sockets closed.
+        """
+        replay = get_replay_store()
+        if replay is not None:
+            replay.discard(room_id)
+
+        room = self._rooms.get(room_id)
+        websockets = list(room.members) if room is not None else []
+        for websocket in websockets:
+            self.disconnect(websocket)
+            self._close_later(websocket, status.WS_1000_NORMAL_CLOSURE, reason)
+
+        self._idle_slots.pop(room_id, None)
+        return len(websockets)
+
+    async def close_gracefully(
+        self,
+        connection: Connection,
+        *,
+        code: int,
+        reason: str = "",
+        flush_timeout: float = 0,
+    ) -> None:
+        """
+        Flush a connection's outbound buffer (bounded by flush_timeout),
+        then unregister and close it.
+        """
+        if flush_timeout:
+            await connection.flush(flush_timeout)
+
+        websocket = connection.websocket
+        self.disconnect(websocket)
+        await _close_quietly(websocket, code, reason)
+
+    def _evict(self, connection: Connection) -> None:
+        _evictions.inc()
+        websocket = connection.websocket
+        self.disconnect(websocket)
+        self._close_later(websocket, status.WS_1013_TRY_AGAIN_LATER)
+
+    def _close_later(self, websocket: WebSocket, code: int, reason: str = "") -> None:
+        # Unregistered already; the task is only kept so it can't be
+        # garbage-collected before the close frame goes out
+        task = asyncio.create_task(_close_quietly(websocket, code, reason))
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    def room_members(self, room_id: UUID) -> frozenset[WebSocket]:
+        room = self._rooms.get(room_id)
+        return frozenset(room.members) if room is not None else frozenset()
+
+    def roster(self, room_id: UUID) -> dict[int, str]:
+        """
+        Current slot -> display name map for a room, including members on
+        other processes when a backplane is attached.
+        """
+        room = self._rooms.get(room_id)
+        return dict(room.presence.roster) if room is not None else {}
+
+    def room_size(self, room_id: UUID) -> int:
+        room = self._rooms.get(room_id)
+        return len(room.members) if room is not None else 0
+
+    def queue_depths(self) -> dict[WebSocket, tuple[int, int]]:
+        """
+        Outbound backlog per socket as (frames, bytes).
+        """
+        return {
+            websocket: (connection.queue_depth, connection.queued_bytes)
+            for websocket, connection in self._connections.items()
+        }
+
+    def all_connections(self) -> list[Connection]:
+        return list(self._connections.values())
+
+    def is_registered(self, connection: Connection) -> bool:
+        return self._connections.get(connection.websocket) is connection
 
     @property
-    def connections(self) -> Set[WebSocket]:
+    def compression_memory(self) -> int:
+        """
+        Bytes held by per-connection deflate contexts across all sockets.
+        """
+        return self._compression_memory
+
+    def get(self, websocket: WebSocket) -> Connection | None:
+        return self._connections.get(websocket)
+
+    @property
+    def room_count(self) -> int:
+        return len(self._rooms)
+
+    @property
+    def connection_count(self) -> int:
+        return len(self._connections)
+
+    @property
+    def connections(self) -> frozenset[WebSocket]:
         """
         Read-only view of active connections.
         """
-        return self._connections
+        return frozenset(self._connections)
+
+
+async def _close_quietly(websocket: WebSocket, code: int, reason: str = "") -> None:
+    try:
+        await websocket.close(code=code, reason=reason)
+    except Exception:
+        pass
 
 
 # Singleton registry for the process
 connections = ConnectionRegistry()
+
+metrics.gauge(
+    "wwi_ws_connections", "Open WebSocket connections",
+    callback=lambda: connections.connection_count)
+metrics.gauge(
+    "wwi_ws_rooms", "Rooms with at least one local connection",
+    callback=lambda: connections.room_count)
+metrics.gauge(
+    "wwi_ws_compression_memory_bytes", "Memory held by per-connection deflate contexts",
+    callback=lambda: connections.compression_memory)
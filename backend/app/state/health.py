@@ -0,0 +1,102 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+
+from app.core.config import HealthSettings
+from app.core.db import check_database_connection
+from app.core.security import hashing_pool_saturation
+from app.state.connections import connections
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class HealthSnapshot:
+    checked_at: float
+    checks: dict[str, bool]
+    details: dict[str, float | int | None] = field(default_factory=dict)
+
+
+class HealthMonitor:
+    """
+    Refreshes component status on its own schedule.
+
+    Probes read the cached snapshot, so probe traffic never checks out a
+    pool connection or runs a query. The monitor also samples event-loop
+    lag: how late its own timer fires compared to the requested sleep.
+    """
+
+    def __init__(self, settings: HealthSettings) -> None:
+        self._settings = settings
+        self.snapshot: HealthSnapshot | None = None
+        self._loop_lag_ms = 0.0
+
+    def is_fresh(self) -> bool:
+        return (
+            self.snapshot is not None
+            and time.monotonic() - self.snapshot.checked_at
+            <= self._settings.stale_after_seconds
+        )
+
+    async def refresh(self) -> HealthSnapshot:
+        settings = self._settings
+
+        database = True
+        try:
+            await asyncio.wait_for(
+                check_database_connection("background"), settings.db_timeout_seconds)
+        except Exception:
+            database = False
+
+        active = connections.connection_count
+        saturation = hashing_pool_saturation()
+
+        self.snapshot = HealthSnapshot(
+            checked_at=time.monotonic(),
+            checks={
+                "database": database,
+                "event_loop": self._loop_lag_ms <= settings.max_loop_lag_ms,
+                "websocket": (
+                    settings.max_connections is None
+                    or active <= settings.max_connections
+                ),
+                "hash_pool": saturation < settings.max_hash_pool_saturation,
+            },
+            details={
+                "loop_lag_ms": round(self._loop_lag_ms, 3),
+                "connections": active,
+                "rooms": connections.room_count,
+                "hash_pool_saturation": round(saturation, 3),
+            },
+        )
+
+        return self.snapshot
+
+    async def run(self) -> None:
+        """
+        Refresh forever. Intended to run as a background task.
+        """
+        interval = self._settings.interval_seconds
+
+        while True:
+            try:
+                await self.refresh()
+            except Exception:
+                logger.exception("Health refresh failed")
+
+            start = time.monotonic()
+            await asyncio.sleep(interval)
+            self._loop_lag_ms = max(0.0, (time.monotonic() - start - interval) * 1000)
+
+
+_monitor: HealthMonitor | None = None
+
+
+def get_health_monitor() -> HealthMonitor | None:
+    return _monitor
+
+
+def set_health_monitor(monitor: HealthMonitor | None) -> None:
+    global _monitor
+    _monitor = monitor
@@ -0,0 +1,149 @@
+import asyncio
+import random
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+
+from app.core.config import DiagnosticsSettings
+from app.core.metrics import metrics
+
+_lag_seconds = metrics.histogram(
+    "wwi_event_loop_lag_seconds", "How late the loop probe woke up")
+_stalls_total = metrics.counter(
+    "wwi_event_loop_stalls_total", "Callbacks that held the event loop past the threshold")
+
+
+class LoopMonitor:
+    """
+    Continuous event-loop lag probe plus a stall watchdog.
+
+    The probe is a task that sleeps for a fixed interval and records how
+    late it wakes up; it also stamps a heartbeat. A watchdog thread polls
+    that heartbeat, and when it goes stale for longer than the threshold
+    the loop is stuck inside one callback: the watchdog grabs the loop
+    thread's current frame, which is the code doing the blocking.
+
+    In steady state the cost is one timer per probe interval and one
+    thread wake-up per half threshold. Stacks are only formatted for
+    stalls, and only for a sampled fraction of them.
+    """
+
+    def __init__(self, settings: DiagnosticsSettings) -> None:
+        self._settings = settings
+        self._interval = settings.probe_interval_ms / 1000
+        self._threshold = settings.slow_callback_ms / 1000
+
+        self._lags: deque[float] = deque(maxlen=settings.lag_window)
+        self._stalls: deque[dict] = deque(maxlen=settings.max_stalls)
+
+        self._beat = time.monotonic()
+        self._loop_thread: int | None = None
+        self._stop = threading.Event()
+
+    async def run(self) -> None:
+        """
+        Probe forever. Intended to run as a background task.
+        """
+        self._loop_thread = threading.get_ident()
+        self._beat = time.monotonic()
+        self._stop.clear()
+
+        watchdog = threading.Thread(
+            target=self._watch, args=(asyncio.get_running_loop(),),
+            name="loop-watchdog", daemon=True)
+        watchdog.start()
+
+        interval = self._interval
+
+        try:
+            while True:
+                start = time.monotonic()
+                await asyncio.sleep(interval)
+                now = time.monotonic()
+
+                lag = max(0.0, now - start - interval)
+                self._beat = now
+                self._lags.append(lag)
+                _lag_seconds.observe(lag)
+        finally:
+            self._stop.set()
+
+    def _watch(self, loop: asyncio.AbstractEventLoop) -> None:
+        stalled_beat: float | None = None
+        record: dict | None = None
+
+        while not self._stop.wait(self._threshold / 2):
+            beat = self._beat
+            # The heartbeat normally ages up to one probe interval
+            blocked = time.monotonic() - beat - self._interval
+
+            if blocked < self._threshold:
+                stalled_beat = None
+                continue
+
+            if beat == stalled_beat:
+                # Same stall, still going
+                record["blocked_ms"] = round(blocked * 1000, 1)
+                continue
+
+            stalled_beat = beat
+            record = {
+                "detected_at": time.time(),
+                "blocked_ms": round(blocked * 1000, 1),
+                "stack": self._capture_stack(),
+            }
+            self._stalls.append(record)
+            # Metrics are only updated on the loop thread; this runs as
+            # soon as the stalled callback returns
+            try:
+                loop.call_soon_threadsafe(_stalls_total.inc)
+            except RuntimeError:
+                # Loop already closed (shutdown)
+                pass
+
+    def _capture_stack(self) -> list[str] | None:
+        settings = self._settings
+
+        if random.random() >= settings.stack_sample_rate:
+            return None
+
+        frame = sys._current_frames().get(self._loop_thread)
+        if frame is None:
+            return None
+
+        stack = traceback.extract_stack(frame, limit=settings.stack_depth)
+        return [line.rstrip() for line in stack.format()]
+
+    def report(self) -> dict:
+        lags = sorted(self._lags)
+
+        def pct(q: float) -> float:
+            if not lags:
+                return 0.0
+            return round(lags[min(len(lags) - 1, int(q * len(lags)))] * 1000, 3)
+
+        return {
+            "probe_interval_ms": self._settings.probe_interval_ms,
+            "slow_callback_ms": self._settings.slow_callback_ms,
+            "lag_ms": {
+                "samples": len(lags),
+                "p50": pct(0.50),
+                "p99": pct(0.99),
+                "max": pct(1.0),
+            },
+            "stalls": list(self._stalls),
+        }
+
+
+_monitor: LoopMonitor | None = None
+
+
+def get_loop_monitor() -> LoopMonitor | None:
+    return _monitor
+
+
+def set_loop_monitor(monitor: LoopMonitor | None) -> None:
+    global _monitor
+    _monitor = monitor
@@ -0,0 +1,145 @@
+import asyncio
+import json
+from typing import TYPE_CHECKING, Iterable
+
+if TYPE_CHECKING:
+    from app.state.connections import Connection
+
+
+def clean_display_name(name: str, max_chars: int) -> str:
+    """
+    Normalise a client-supplied display name: single line, trimmed, capped.
+    """
+    return " ".join(name.split())[:max_chars]
+
+
+def _dumps(value: object) -> bytes:
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+class _Change:
+    """
+    Net effect of one batch on one slot.
+
+    present_before: the slot was on the roster clients last saw
+    left: that member has gone (the slot may since have been reused)
+    name: current name, or None if the slot is now empty
+    """
+
+    __slots__ = ("present_before", "left", "name")
+
+    def __init__(self, present_before: bool) -> None:
+        self.present_before = present_before
+        self.left = False
+        self.name: str | None = None
+
+
+class RoomPresence:
+    """
+    Roster of one room (slot -> display name) plus the changes not yet
+    announced.
+
+    join / leave / rename are O(1): they update the roster and fold into
+    a per-slot change record, so a slot that joins and leaves within one
+    batch costs nothing to announce. Once per batch the registry calls
+    take_batch(): existing members get one PRESENCE delta, and everyone
+    admitted during the batch gets one ROSTER snapshot, built once and
+    shared, which already includes the batch's changes.
+
+    With a backplane the roster also holds members on other nodes (their
+    slots never overlap ours); their deltas are folded in by apply_remote
+    and reach local clients as the relayed PRESENCE frame itself.
+    """
+
+    __slots__ = ("roster", "_changes", "_joiners", "flush_handle")
+
+    def __init__(self) -> None:
+        self.roster: dict[int, str] = {}
+        self._changes: dict[int, _Change] = {}
+        self._joiners: list["Connection"] = []
+        self.flush_handle: asyncio.TimerHandle | None = None
+
+    def _change(self, slot: int) -> _Change:
+        change = self._changes.get(slot)
+        if change is None:
+            change = self._changes[slot] = _Change(slot in self.roster)
+        return change
+
+    def join(self, connection: "Connection", name: str) -> None:
+        self._change(connection.slot).name = name
+        self.roster[connection.slot] = name
+        self._joiners.append(connection)
+
+    def leave(self, slot: int) -> None:
+        change = self._change(slot)
+        if change.present_before:
+            change.left = True
+        change.name = None
+        self.roster.pop(slot, None)
+
+    def rename(self, slot: int, name: str) -> None:
+        if slot not in self.roster:
+            return
+        self._change(slot).name = name
+        self.roster[slot] = name
+
+    def apply_remote(self, delta: bytes) -> None:
+        """
+        Fold another node's PRESENCE payload into the roster. Nothing is
+        queued for announcement: the frame is relayed to local clients as is.
+        """
+        change = json.loads(delta)
+
+        for slot, name in change.get("joined", {}).items():
+            self.roster[int(slot)] = name
+        for slot, name in change.get("renamed", {}).items():
+            self.roster[int(slot)] = name
+        for slot in change.get("left", ()):
+            self.roster.pop(slot, None)
+
+    def joined_delta(self, slots: Iterable[int]) -> bytes:
+        """
+        PRESENCE payload announcing these members as joined.
+        """
+        roster = self.roster
+        joined = {str(slot): roster[slot] for slot in slots if slot in roster}
+        return _dumps({"joined": joined, "renamed": {}, "left": []})
+
+    @property
+    def has_pending(self) -> bool:
+        return bool(self._changes or self._joiners)
+
+    def take_batch(self) -> tuple[bytes | None, bytes | None, list["Connection"]]:
+        """
+        Return (roster snapshot, delta, connections admitted this batch)
+        and start a new batch. Either payload is None if not needed.
+        """
+        joined: dict[str, str] = {}
+        renamed: dict[str, str] = {}
+        left: list[int] = []
+
+        for slot, change in self._changes.items():
+            if change.left:
+                left.append(slot)
+            if change.name is None:
+                continue
+            if change.present_before and not change.left:
+                renamed[str(slot)] = change.name
+            else:
+                joined[str(slot)] = change.name
+
+        joiners = self._joiners
+        self._changes = {}
+        self._joiners = []
+
+        snapshot = None
+        if joiners:
+            snapshot = _dumps({
+                "members": {str(slot): name for slot, name in self.roster.items()},
+            })
+
+        delta = None
+        if joined or renamed or left:
+            delta = _dumps({"joined": joined, "renamed": renamed, "left": left})
+
+        return snapshot, delta, joiners
@@ -0,0 +1,224 @@
+import logging
+import math
+import time
+from collections import OrderedDict
+
+from app.core.config import RateLimitSettings, get_settings
+from app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+_limited = metrics.counter(
+    "wwi_rate_limited_total", "Requests rejected by the rate limiter", ["rule"])
+
+
+class RateLimitedError(Exception):
+    def __init__(self, retry_after: float) -> None:
+        super().__init__("Rate limit exceeded")
+        self.retry_after = retry_after
+
+
+class TokenBucketLimiter:
+    """
+    In-process token buckets, one per key, split over independent shards.
+
+    Buckets refill lazily: the elapsed time since the last request is
+    converted to tokens when the key is next seen, so idle keys cost
+    nothing. Each shard is an LRU; past its share of max_keys the least
+    recently used key is dropped. That is safe because a bucket left idle
+    long enough to be the coldest is (nearly) full again anyway, and a
+    fresh bucket starts full.
+
+    A request costing more than the burst is admitted only from a full
+    bucket and leaves it in debt, so it is paid for by the wait that
+    follows rather than being impossible. Cost 0 is a probe: allowed if
+    a token is available, without spending it. A negative cost refunds
+    tokens taken earlier (never past the burst) and always succeeds.
+    """
+
+    __slots__ = ("_rate", "_burst", "_shards", "_shard_max")
+
+    def __init__(self, rate: float, burst: int, shards: int, max_keys: int) -> None:
+        self._rate = rate
+        self._burst = float(burst)
+        # key -> [tokens, last refill (monotonic)]
+        self._shards: list[OrderedDict[str, list[float]]] = [
+            OrderedDict() for _ in range(shards)]
+        self._shard_max = max(1, math.ceil(max_keys / shards))
+
+    def take(self, key: str, cost: float = 1.0) -> float:
+        """
+        Spend cost tokens from key's bucket.
+        Returns 0 if allowed, else the seconds until it would be.
+        """
+        needed = min(max(cost, 1), self._burst)
+        shard = self._shards[hash(key) % len(self._shards)]
+        now = time.monotonic()
+        bucket = shard.get(key)
+
+        if bucket is None:
+            bucket = shard[key] = [self._burst, now]
+            if len(shard) > self._shard_max:
+                shard.popitem(last=False)
+        else:
+            shard.move_to_end(key)
+            bucket[0] = min(self._burst, bucket[0] + (now - bucket[1]) * self._rate)
+            bucket[1] = now
+
+        if cost < 0:
+            bucket[0] = min(self._burst, bucket[0] - cost)
+            return 0.0
+
+        if bucket[0] >= needed:
+            bucket[0] -= cost
+            return 0.0
+
+        return (needed - bucket[0]) / self._rate
+
+    def __len__(self) -> int:
+        return sum(len(shard) for shard in self._shards)
+
+
+# Atomic refill + take on a Redis hash. Uses the server clock so replicas
+# with skewed clocks agree; idle keys expire once they would be full.
+_REDIS_TAKE = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + (now - ts) * rate)
+
+local needed = math.min(math.max(cost, 1), burst)
+local wait = 0
+if cost < 0 then
+    tokens = math.min(burst, tokens - cost)
+elseif tokens >= needed then
+    tokens = tokens - cost
+else
+    wait = (needed - tokens) / rate
+end
+
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil((burst - tokens) / rate * 1000))
+return tostring(wait)
+"""
+
+
+class RateLimiter:
+    """
+    Named token-bucket rules (join_per_ip, join_per_room, create_per_ip).
+
+    With the redis backend buckets are shared by all replicas; if Redis
+    fails, the in-process buckets take over so the limit degrades to
+    per-replica instead of disappearing.
+    """
+
+    def __init__(self, settings: RateLimitSettings) -> None:
+        self._settings = settings
+        # rule -> (rate per second, burst)
+        self._rules: dict[str, tuple[float, int]] = {
+            "join_per_ip": (settings.join_per_ip_rate, settings.join_per_ip_burst),
+            "join_per_room": (settings.join_per_room_rate, settings.join_per_room_burst),
+            "create_per_ip": (settings.create_per_ip_rate, settings.create_per_ip_burst),
+        }
+        self._local = {
+            name: TokenBucketLimiter(rate, burst, settings.shards, settings.max_keys)
+            for name, (rate, burst) in self._rules.items()
+        }
+        self._rejected = {name: _limited.labels(name) for name in self._rules}
+
+        self._redis = None
+        self._redis_take = None
+        self._redis_failing = False
+
+        if settings.backend == "redis":
+            try:
+                from redis import asyncio as aioredis
+            except ImportError as exc:
+                raise RuntimeError(
+                    "Redis rate limiting requires the 'redis' extra "
+                    "(pip install 'who-was-i-backend[redis]')"
+                ) from exc
+
+            self._redis = aioredis.from_url(settings.redis_url)
+            self._redis_take = self._redis.register_script(_REDIS_TAKE)
+
+    async def check(self, rule: str, key: str, cost: int = 1) -> None:
+        """
+        Spend cost tokens (e.g. one per room of a bulk request; 0 only
+        checks that one is available).
+        Raises RateLimitedError if key is over the rule's limit.
+        """
+        wait = None
+
+        if self._redis is not None:
+            wait = await self._take_shared(rule, key, cost)
+        if wait is None:
+            wait = self._local[rule].take(key, cost)
+
+        if wait:
+            self._rejected[rule].inc()
+            raise RateLimitedError(wait)
+
+    async def refund(self, rule: str, key: str, amount: int = 1) -> None:
+        """
+        Give back tokens spent by check() for an attempt that turned out
+        not to count (e.g. a join with the right password).
+        """
+        if self._redis is not None and await self._take_shared(rule, key, -amount) is not None:
+            return
+        self._local[rule].take(key, -amount)
+
+    async def _take_shared(self, rule: str, key: str, cost: int) -> float | None:
+        rate, burst = self._rules[rule]
+        try:
+            wait = await self._redis_take(
+                keys=[f"{self._settings.key_prefix}{rule}:{key}"],
+                args=[rate, burst, cost],
+            )
+        except Exception:
+            if not self._redis_failing:
+                logger.warning("Redis rate limiter unavailable; using local buckets",
+                               exc_info=True)
+                self._redis_failing = True
+            return None
+
+        self._redis_failing = False
+        return float(wait)
+
+    async def close(self) -> None:
+        if self._redis is not None:
+            await self._redis.aclose()
+
+
+_rate_limiter: RateLimiter | None = None
+
+
+def get_rate_limiter() -> RateLimiter | None:
+    """
+    Return the process-wide rate limiter, or None if rate limiting is disabled.
+    """
+    global _rate_limiter
+
+    settings = get_settings().rate_limit
+
+    if not settings.enabled:
+        return None
+
+    if _rate_limiter is None:
+        _rate_limiter = RateLimiter(settings)
+
+    return _rate_limiter
+
+
+async def close_rate_limiter() -> None:
+    global _rate_limiter
+
+    if _rate_limiter is not None:
+        await _rate_limiter.close()
+        _rate_limiter = None
@@ -0,0 +1,203 @@
+import secrets
+import time
+from collections import OrderedDict, deque
+from uuid import UUID
+
+from app.core.config import ReplaySettings, get_settings
+from app.core.metrics import metrics
+from app.core.protocol import stamp_sequence
+
+# 20-bit epoch + 32-bit counter: sequence numbers stay below 2**53, so
+# JavaScript clients can hold them as plain numbers
+_EPOCH_BITS = 20
+_EPOCH_SHIFT = 32
+_COUNTER_MASK = (1 << _EPOCH_SHIFT) - 1
+
+
+class ReplayRing:
+    """
+    Recent MESSAGE frames of one room, oldest first, bounded by count,
+    bytes and age.
+
+    A sequence number is the ring's random epoch above a contiguous 32-bit
+    counter. Rings are per process, so the same room on another replica,
+    or this one's ring recreated after eviction, numbers its frames under
+    a different epoch; a cursor from there says nothing about what this
+    ring holds.
+    """
+
+    __slots__ = ("_frames", "bytes", "epoch", "next_seq", "last_active")
+
+    def __init__(self) -> None:
+        # (seq, monotonic time, stamped frame)
+        self._frames: deque[tuple[int, float, bytes]] = deque()
+        self.bytes = 0
+        self.last_active = time.monotonic()
+        self._new_epoch()
+
+    def _new_epoch(self) -> None:
+        self.epoch = secrets.randbits(_EPOCH_BITS)
+        self.next_seq = self.epoch << _EPOCH_SHIFT
+
+    @property
+    def first_seq(self) -> int:
+        return self._frames[0][0] if self._frames else self.next_seq
+
+    def append(self, frame: bytes, now: float, settings: ReplaySettings) -> tuple[int, bytes]:
+        if self.next_seq & _COUNTER_MASK == _COUNTER_MASK:
+            # Counter exhausted: start over as if the ring were new
+            while self._frames:
+                self._drop_oldest()
+            self._new_epoch()
+
+        seq = self.next_seq
+        self.next_seq += 1
+
+        stamped = stamp_sequence(frame, seq)
+        self._frames.append((seq, now, stamped))
+        self.bytes += len(stamped)
+        self.last_active = now
+
+        while self._frames and (
+            len(self._frames) > settings.max_messages
+            or self.bytes > settings.max_bytes
+        ):
+            self._drop_oldest()
+
+        self.expire(now, settings.max_age_seconds)
+        return seq, stamped
+
+    def expire(self, now: float, max_age: float) -> None:
+        while self._frames and now - self._frames[0][1] > max_age:
+            self._drop_oldest()
+
+    def _drop_oldest(self) -> None:
+        _, _, frame = self._frames.popleft()
+        self.bytes -= len(frame)
+
+    def since(self, seq: int, until: int | None = None) -> tuple[bool, list[bytes]]:
+        """
+        Frames with sequence numbers after seq (and before until).
+        The flag is False if seq is not covered by this ring, i.e. some
+        frames the client is missing are gone; everything held is then
+        returned, unless seq is from another epoch, in which case nothing
+        is (the client can't tell which of them it already has).
+        """
+        if seq >> _EPOCH_SHIFT != self.epoch:
+            return False, []
+
+        complete = self.first_seq - 1 <= seq < self.next_seq
+        start = seq + 1 if complete else self.first_seq
+
+        frames = [
+            frame for frame_seq, _, frame in self._frames
+            if frame_seq >= start and (until is None or frame_seq < until)
+        ]
+        return complete, frames
+
+
+class ReplayStore:
+    """
+    Replay rings for all rooms on this process, in memory only.
+
+    Rooms are kept in least-recently-active order. Past max_total_bytes
+    whole rings of the coldest rooms are dropped, and rings that have
+    been idle past max_age are dropped as other rooms append, so the
+    total stays bounded without a sweeper task.
+    """
+
+    def __init__(self, settings: ReplaySettings) -> None:
+        self._settings = settings
+        self._rings: OrderedDict[UUID, ReplayRing] = OrderedDict()
+        self.bytes = 0
+
+    def append(self, room_id: UUID, frame: bytes) -> tuple[int, bytes]:
+        """
+        Sequence and keep one MESSAGE frame. Returns (seq, stamped frame).
+        """
+        now = time.monotonic()
+        ring = self._rings.get(room_id)
+
+        if ring is None:
+            ring = self._rings[room_id] = ReplayRing()
+        else:
+            self._rings.move_to_end(room_id)
+
+        before = ring.bytes
+        seq, stamped = ring.append(frame, now, self._settings)
+        self.bytes += ring.bytes - before
+
+        self._evict(now)
+        return seq, stamped
+
+    def _evict(self, now: float) -> None:
+        settings = self._settings
+
+        while self._rings:
+            room_id, coldest = next(iter(self._rings.items()))
+
+            idle = now - coldest.last_active > settings.max_age_seconds
+            if not idle and self.bytes <= settings.max_total_bytes:
+                break
+
+            del self._rings[room_id]
+            self.bytes -= coldest.bytes
+
+    def since(
+        self,
+        room_id: UUID,
+        seq: int,
+        until: int | None = None,
+    ) -> tuple[bool, int, list[bytes]]:
+        """
+        Returns (complete, oldest seq held or 0, frames after seq).
+        """
+        ring = self._rings.get(room_id)
+        if ring is None:
+            return False, 0, []
+
+        before = ring.bytes
+        ring.expire(time.monotonic(), self._settings.max_age_seconds)
+        self.bytes += ring.bytes - before
+
+        complete, frames = ring.since(seq, until)
+        return complete, ring.first_seq if frames else 0, frames
+
+    def discard(self, room_id: UUID) -> None:
+        """
+        Drop a room's ring (the room itself is gone).
+        """
+        ring = self._rings.pop(room_id, None)
+        if ring is not None:
+            self.bytes -= ring.bytes
+
+    def room_count(self) -> int:
+        return len(self._rings)
+
+
+_store: ReplayStore | None = None
+
+
+def get_replay_store() -> ReplayStore | None:
+    """
+    Return the process-wide replay store, or None if replay is disabled.
+    """
+    global _store
+
+    settings = get_settings().websocket.replay
+
+    if not settings.enabled:
+        return None
+
+    if _store is None:
+        _store = ReplayStore(settings)
+
+    return _store
+
+
+metrics.gauge(
+    "wwi_replay_bytes", "Bytes held in room replay rings",
+    callback=lambda: _store.bytes if _store is not None else 0)
+metrics.gauge(
+    "wwi_replay_rooms", "Rooms with a replay ring",
+    callback=lambda: _store.room_count() if _store is not None else 0)
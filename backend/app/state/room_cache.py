@@ -0,0 +1,155 @@
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from uuid import UUID
+
+from app.core.config import get_settings
+from app.core.metrics import metrics
+
+
+@dataclass(slots=True, frozen=True)
+class CachedRoom:
+    """
+    Immutable snapshot of the room fields the join path needs.
+    """
+    id: UUID
+    room_code: str
+    name: str
+    password_hash: str | None
+    expires_at: datetime | None
+
+
+class RoomCache:
+    """
+    In-process TTL + LRU cache of rooms keyed by room_code.
+
+    Misses are cached too (as None), so repeated lookups of unknown codes
+    never reach the database. Positive entries never outlive the room's
+    own expires_at.
+
+    This state is intentionally ephemeral.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        ttl_seconds: float,
+        negative_ttl_seconds: float,
+    ) -> None:
+        self._entries: OrderedDict[str, tuple[float, CachedRoom | None]] = OrderedDict()
+        self._max_entries = max_entries
+        self._ttl = ttl_seconds
+        self._negative_ttl = negative_ttl_seconds
+
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+
+    def lookup(self, room_code: str) -> tuple[bool, CachedRoom | None]:
+        """
+        Return (cached, room). cached is False if the caller must hit the DB;
+        otherwise room is the cached snapshot or None for a known miss.
+        """
+        entry = self._entries.get(room_code)
+
+        if entry is None:
+            self.misses += 1
+            return False, None
+
+        deadline, room = entry
+
+        if deadline < time.time():
+            del self._entries[room_code]
+            self.misses += 1
+            return False, None
+
+        self._entries.move_to_end(room_code)
+
+        if room is None:
+            self.negative_hits += 1
+        else:
+            self.hits += 1
+
+        return True, room
+
+    def put(self, room: CachedRoom) -> None:
+        now = time.time()
+        deadline = now + self._ttl
+
+        if room.expires_at is not None:
+            expires_at = room.expires_at.timestamp()
+            if expires_at > now:
+                deadline = min(deadline, expires_at)
+
+        self._store(room.room_code, deadline, room)
+
+    def put_missing(self, room_code: str) -> None:
+        if self._negative_ttl > 0:
+            self._store(room_code, time.time() + self._negative_ttl, None)
+
+    def invalidate(self, room_code: str) -> None:
+        self._entries.pop(room_code, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def _store(self, room_code: str, deadline: float, room: CachedRoom | None) -> None:
+        self._entries[room_code] = (deadline, room)
+        self._entries.move_to_end(room_code)
+
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "negative_hits": self.negative_hits,
+            "misses": self.misses,
+        }
+
+
+_room_cache: RoomCache | None = None
+
+
+def get_room_cache() -> RoomCache | None:
+    """
+    Return the process-wide room cache, or None if caching is disabled.
+    """
+    global _room_cache
+
+    settings = get_settings().room_cache
+
+    if not settings.enabled:
+        return None
+
+    if _room_cache is None:
+        _room_cache = RoomCache(
+            max_entries=settings.max_entries,
+            ttl_seconds=settings.ttl_seconds,
+            negative_ttl_seconds=settings.negative_ttl_seconds,
+        )
+
+    return _room_cache
+
+
+def _cache_stat(key: str):
+    return lambda: _room_cache.stats()[key] if _room_cache is not None else 0
+
+
+metrics.gauge(
+    "wwi_room_cache_entries", "Entries in the room cache",
+    callback=_cache_stat("size"))
+metrics.counter(
+    "wwi_room_cache_hits_total", "Room lookups served from the cache",
+    callback=_cache_stat("hits"))
+metrics.counter(
+    "wwi_room_cache_negative_hits_total", "Room lookups answered by a cached miss",
+    callback=_cache_stat("negative_hits"))
+metrics.counter(
+    "wwi_room_cache_misses_total", "Room lookups that went to the database",
+    callback=_cache_stat("misses"))
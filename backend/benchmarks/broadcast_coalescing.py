@@ -0,0 +1,133 @@
+"""
+Room broadcast throughput vs latency, with and without write coalescing.
+
+Runs the real ConnectionRegistry against in-process fake sockets. Each
+fake send burns --send-cost-us of CPU to stand in for the per-frame
+syscall and framing cost. Prints one JSON line per mode.
+
+    python -m benchmarks.broadcast_coalescing --members 50 --rate 2000
+"""
+import argparse
+import asyncio
+import json
+import os
+import struct
+import time
+import uuid
+
+os.environ.setdefault("WWI_DATABASE__URL", "postgresql+asyncpg://bench@localhost/bench")
+
+from app.core.config import get_settings  # noqa: E402
+from app.core.protocol import HEADER, HEADER_SIZE, FrameType, encode_frame  # noqa: E402
+from app.state.connections import ConnectionRegistry  # noqa: E402
+
+_STAMP = struct.Struct("!q")
+
+
+class FakeSocket:
+    """
+    Records one latency sample per envelope it receives, skipping its
+    own (coalesced batches echo them back, as they do to real clients).
+    """
+
+    def __init__(self, send_cost_ns: int, samples: list[int]) -> None:
+        self._send_cost_ns = send_cost_ns
+        self._samples = samples
+        self.frames = 0
+        self.slot = 0
+
+    async def send(self, message) -> None:
+        deadline = time.perf_counter_ns() + self._send_cost_ns
+        while time.perf_counter_ns() < deadline:
+            pass
+
+        data = message["bytes"]
+        now = time.perf_counter_ns()
+        offset = 0
+        while offset < len(data):
+            _, _, slot, _, length = HEADER.unpack_from(data, offset)
+            if slot != self.slot:
+                (sent,) = _STAMP.unpack_from(data, offset + HEADER_SIZE)
+                self._samples.append(now - sent)
+            offset += HEADER_SIZE + length
+
+        self.frames += 1
+        await asyncio.sleep(0)
+
+
+def _percentile(values: list[int], q: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))] / 1e6
+
+
+async def run_mode(args: argparse.Namespace, window_ms: float) -> dict:
+    settings = get_settings().websocket
+    settings.coalesce_window_ms = window_ms
+    settings.coalesce_max_bytes = args.budget
+    settings.send_queue_size = 1_000_000
+    settings.send_queue_high_water_bytes = 1 << 40
+
+    registry = ConnectionRegistry()
+    room_id = uuid.uuid4()
+    samples: list[int] = []
+    sockets = [FakeSocket(args.send_cost_us * 1000, samples) for _ in range(args.members)]
+    slots = [registry.register(ws, room_id).slot for ws in sockets]
+    for ws, slot in zip(sockets, slots):
+        ws.slot = slot
+
+    interval = 1 / args.rate
+    sent = 0
+    start = time.perf_counter()
+
+    while time.perf_counter() - start < args.duration:
+        slot = slots[sent % len(slots)]
+        payload = _STAMP.pack(time.perf_counter_ns()) + b"x" * args.payload
+        frame = encode_frame(FrameType.MESSAGE, slot, room_id, payload)
+        registry.broadcast(room_id, frame, exclude=sockets[sent % len(sockets)])
+        sent += 1
+        await asyncio.sleep(interval)
+
+    # Let writers drain what is still queued
+    await asyncio.sleep(max(0.2, window_ms / 1000 * 2))
+    elapsed = time.perf_counter() - start
+
+    for ws in sockets:
+        registry.disconnect(ws)
+
+    return {
+        "benchmark": "broadcast_coalescing",
+        "coalesce_window_ms": window_ms,
+        "members": args.members,
+        "offered_rate": args.rate,
+        "messages_sent": sent,
+        "deliveries": len(samples),
+        "deliveries_per_s": round(len(samples) / elapsed),
+        "frames_written": sum(ws.frames for ws in sockets),
+        "latency_p50_ms": round(_percentile(samples, 0.50), 3),
+        "latency_p99_ms": round(_percentile(samples, 0.99), 3),
+    }
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    for window_ms in [0.0, *args.windows]:
+        print(json.dumps(await run_mode(args, window_ms)), flush=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--members", type=int, default=50)
+    parser.add_argument("--rate", type=float, default=2000, help="messages/s offered")
+    parser.add_argument("--duration", type=float, default=3.0)
+    parser.add_argument("--payload", type=int, default=64)
+    parser.add_argument("--send-cost-us", type=int, default=5)
+    parser.add_argument("--budget", type=int, default=64 * 1024)
+    parser.add_argument("--windows", type=float, nargs="*", default=[5.0, 20.0])
+    args = parser.parse_args()
+
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
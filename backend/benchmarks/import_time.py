@@ -0,0 +1,119 @@
+"""
+Import-time budget: cold `import app.main` plus create_app().
+
+Each run is a fresh interpreter (bytecode cache warm, as after a
+deploy's first start), timed from inside the child so interpreter boot
+is excluded. Also checks that building the app did not load any of the
+subsystems that are meant to load on first use (ORM, driver, Argon2,
+Redis), and lists the slowest top-level imports from -X importtime.
+
+Prints JSON and exits 1 if the median run is over --budget-ms or a
+lazy module was loaded, so CI can run it like a test:
+
+    python -m benchmarks.import_time --budget-ms 400
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+LAZY_MODULES = ["sqlalchemy", "asyncpg", "argon2", "redis", "app.schema"]
+
+_CHILD = """
+import json, sys, time
+start = time.perf_counter()
+import app.main
+app.main.create_app()
+elapsed = time.perf_counter() - start
+print(json.dumps({
+    "ms": elapsed * 1000,
+    "loaded": [m for m in %r if m in sys.modules],
+}))
+"""
+
+
+def _child_env() -> dict[str, str]:
+    env = dict(os.environ)
+    # Required setting; nothing connects during import
+    env.setdefault("WWI_DATABASE__URL", "postgresql+asyncpg://bench@localhost/bench")
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [os.getcwd(), env.get("PYTHONPATH")]))
+    return env
+
+
+def _run_once(env: dict[str, str]) -> dict:
+    result = subprocess.run(
+        [sys.executable, "-c", _CHILD % (LAZY_MODULES,)],
+        env=env, capture_output=True, text=True, check=True,
+    )
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+def _slowest_imports(env: dict[str, str], top: int) -> list[dict]:
+    """
+    Top-level imports of app.main (direct children in the import tree)
+    by cumulative time, from one -X importtime run.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        env=env, capture_output=True, text=True, check=True,
+    )
+
+    imports = []
+    for line in result.stderr.splitlines():
+        # "import time: self | cumulative | <indent>module", header excluded
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+
+        _, cumulative, module = line[len("import time:"):].split("|")
+        # app.main itself has one space of indent, its imports three
+        if len(module) - len(module.lstrip()) == 3:
+            imports.append({"module": module.strip(), "ms": round(int(cumulative) / 1000, 1)})
+
+    return sorted(imports, key=lambda i: i["ms"], reverse=True)[:top]
+
+
+def run(args: argparse.Namespace) -> dict:
+    env = _child_env()
+
+    # Discarded: compiles bytecode the first time after a checkout
+    _run_once(env)
+
+    runs = [_run_once(env) for _ in range(args.runs)]
+    times = [r["ms"] for r in runs]
+    loaded = sorted({m for r in runs for m in r["loaded"]})
+    median = statistics.median(times)
+
+    return {
+        "benchmark": "import_time",
+        "runs": args.runs,
+        "budget_ms": args.budget_ms,
+        "median_ms": round(median, 1),
+        "min_ms": round(min(times), 1),
+        "max_ms": round(max(times), 1),
+        "eagerly_loaded": loaded,
+        "slowest_imports": _slowest_imports(env, args.top),
+        "passed": median <= args.budget_ms and not loaded,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget-ms", type=float,
+                        default=float(os.environ.get("WWI_IMPORT_BUDGET_MS", 400)),
+                        help="default $WWI_IMPORT_BUDGET_MS or 400")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="slowest imports to list")
+    args = parser.parse_args()
+
+    report = run(args)
+    print(json.dumps(report, indent=2))
+
+    if not report["passed"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
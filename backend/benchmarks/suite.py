@@ -0,0 +1,340 @@
+"""
+Release benchmark suite: HTTP create/join, WebSocket fan-out, memory.
+
+By default everything runs in-process: the app (with its lifespan) is
+driven through httpx's ASGI transport against a throwaway SQLite file,
+so no server or database is needed. Pass --database-url to use a real
+(ephemeral) Postgres instead, or --base-url to point the HTTP benchmarks
+at a server already listening on localhost; fan-out and memory always
+run in-process against the real ConnectionRegistry. Create/join numbers
+are dominated by Argon2; pin WWI_SECURITY__HASH_* so runs are comparable.
+
+Prints one JSON document. With --baseline, compares against an earlier
+run and exits 1 if any metric regressed by more than --tolerance.
+
+    python -m benchmarks.suite --out bench.json
+    python -m benchmarks.suite --baseline bench.json --tolerance 0.15
+"""
+import argparse
+import asyncio
+import gc
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+import uuid
+
+_DB_FILE = os.path.join(tempfile.gettempdir(), "wwi-bench.db")
+
+
+def _percentile(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def _latency_summary(name: str, samples: list[float], errors: int, elapsed: float) -> dict:
+    return {
+        "benchmark": name,
+        "requests": len(samples) + errors,
+        "errors": errors,
+        "requests_per_s": round(len(samples) / elapsed, 1),
+        "latency_p50_ms": round(_percentile(samples, 0.50) * 1000, 3),
+        "latency_p95_ms": round(_percentile(samples, 0.95) * 1000, 3),
+        "latency_p99_ms": round(_percentile(samples, 0.99) * 1000, 3),
+    }
+
+
+async def _drive(client, requests: list[tuple[str, dict]], concurrency: int):
+    """
+    Send requests from a fixed number of workers; return latencies of
+    successful ones, the error count and wall time.
+    """
+    samples: list[float] = []
+    errors = 0
+    queue = iter(requests)
+
+    async def worker() -> None:
+        nonlocal errors
+        for path, kwargs in queue:
+            start = time.perf_counter()
+            response = await client.post(path, **kwargs)
+            if response.status_code == 200:
+                samples.append(time.perf_counter() - start)
+            else:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return samples, errors, time.perf_counter() - start
+
+
+async def bench_http(client, args: argparse.Namespace) -> list[dict]:
+    creates = [
+        ("/api/rooms/create", {"json": {"name": f"bench-{i}", "password": "bench-pw"}})
+        for i in range(args.requests)
+    ]
+    samples, errors, elapsed = await _drive(client, creates, args.concurrency)
+    create = _latency_summary("http_create", samples, errors, elapsed)
+
+    codes = []
+    for i in range(args.rooms):
+        response = await client.post(
+            "/api/rooms/create", json={"name": f"join-{i}", "password": "bench-pw"})
+        codes.append(response.json()["room_code"])
+
+    joins = [
+        ("/api/rooms/join",
+         {"params": {"room_code": codes[i % len(codes)], "password": "bench-pw"}})
+        for i in range(args.requests)
+    ]
+    samples, errors, elapsed = await _drive(client, joins, args.concurrency)
+    join = _latency_summary("http_join", samples, errors, elapsed)
+
+    for result in (create, join):
+        result["concurrency"] = args.concurrency
+
+    return [create, join]
+
+
+class _SinkSocket:
+    """
+    Minimal stand-in for a Starlette WebSocket: counts what it is sent.
+    """
+
+    def __init__(self) -> None:
+        self.frames = 0
+
+    async def send(self, message) -> None:
+        self.frames += 1
+
+    async def close(self, code: int = 1000, reason: str = "") -> None:
+        pass
+
+
+async def bench_fanout(room_size: int, messages: int) -> dict:
+    from app.core.protocol import FrameType, encode_frame
+    from app.state.connections import ConnectionRegistry
+
+    registry = ConnectionRegistry()
+    room_id = uuid.uuid4()
+    sockets = [_SinkSocket() for _ in range(room_size)]
+    slots = [registry.register(ws, room_id).slot for ws in sockets]
+
+    expected = messages * (room_size - 1)
+    frames = [
+        encode_frame(FrameType.MESSAGE, slots[i % room_size], room_id, b"x" * 64)
+        for i in range(messages)
+    ]
+
+    start = time.perf_counter()
+    for i, frame in enumerate(frames):
+        registry.broadcast(room_id, frame, exclude=sockets[i % room_size])
+        if i % 64 == 63:
+            # Give writers a turn, as the receive loop would
+            await asyncio.sleep(0)
+
+    while sum(ws.frames for ws in sockets) < expected:
+        await asyncio.sleep(0)
+    elapsed = time.perf_counter() - start
+
+    for ws in sockets:
+        registry.disconnect(ws)
+
+    return {
+        "benchmark": "ws_fanout",
+        "room_size": room_size,
+        "messages": messages,
+        "deliveries": expected,
+        "messages_per_s": round(messages / elapsed, 1),
+        "deliveries_per_s": round(expected / elapsed, 1),
+    }
+
+
+async def bench_connection_memory(count: int) -> dict:
+    from app.state.connections import ConnectionRegistry
+
+    registry = ConnectionRegistry()
+    room_ids = [uuid.uuid4() for _ in range(max(1, count // 10))]
+    sockets = [_SinkSocket() for _ in range(count)]
+
+    gc.collect()
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+
+    for i, ws in enumerate(sockets):
+        registry.register(ws, room_ids[i % len(room_ids)])
+    # Let every writer task start and park on its wakeup event
+    await asyncio.sleep(0)
+
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    for ws in sockets:
+        registry.disconnect(ws)
+
+    return {
+        "benchmark": "connection_memory",
+        "connections": count,
+        "bytes_per_connection": round((after - before) / count, 1),
+    }
+
+
+def bench_token_memory(count: int) -> dict:
+    from benchmarks.token_memory import measure
+
+    result = measure(count, max(1, count // 1000))
+    return {
+        "benchmark": "token_memory",
+        "tokens": count,
+        "bytes_per_token": result["bytes_per_token"],
+    }
+
+
+async def _prepare_database() -> None:
+    import app.schema  # noqa: F401  (registers the models)
+    from app.core.base import Base
+    from app.core.db import get_engine
+
+    async with get_engine().begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+
+async def run(args: argparse.Namespace) -> dict:
+    results: list[dict] = []
+
+    if "http" in args.only:
+        import httpx
+
+        if args.base_url:
+            async with httpx.AsyncClient(base_url=args.base_url, timeout=30) as client:
+                results.extend(await bench_http(client, args))
+        else:
+            from app.main import create_app
+
+            await _prepare_database()
+            app = create_app()
+            transport = httpx.ASGITransport(app=app)
+
+            async with app.router.lifespan_context(app):
+                async with httpx.AsyncClient(
+                    transport=transport, base_url="http://bench", timeout=30,
+                ) as client:
+                    results.extend(await bench_http(client, args))
+
+    if "ws" in args.only:
+        for size in args.room_sizes:
+            results.append(await bench_fanout(size, args.messages))
+
+    if "memory" in args.only:
+        results.append(await bench_connection_memory(args.connections))
+        results.append(bench_token_memory(args.tokens))
+
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "database": "external" if args.base_url else os.environ["WWI_DATABASE__URL"].split(":")[0],
+            "timestamp": int(time.time()),
+        },
+        "results": results,
+    }
+
+
+def _key(result: dict) -> tuple:
+    return (result["benchmark"], result.get("room_size"))
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> list[dict]:
+    """
+    Throughput (*_per_s) may not drop, and latency (*_ms) and memory
+    (bytes_per_*) may not grow, by more than the tolerance.
+    """
+    previous = {_key(r): r for r in baseline["results"]}
+    regressions = []
+
+    for result in current["results"]:
+        old = previous.get(_key(result))
+        if old is None:
+            continue
+
+        for metric, value in result.items():
+            before = old.get(metric)
+            if not isinstance(value, (int, float)) or not before:
+                continue
+
+            if metric.endswith("_per_s"):
+                change = (before - value) / before
+            elif metric.endswith("_ms") or metric.startswith("bytes_per_"):
+                change = (value - before) / before
+            else:
+                continue
+
+            if change > tolerance:
+                regressions.append({
+                    "benchmark": result["benchmark"],
+                    "room_size": result.get("room_size"),
+                    "metric": metric,
+                    "baseline": before,
+                    "current": value,
+                    "change": round(change, 3),
+                })
+
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--only", nargs="*", default=["http", "ws", "memory"],
+                        choices=["http", "ws", "memory"])
+    parser.add_argument("--database-url", default=f"sqlite+aiosqlite:///{_DB_FILE}",
+                        help="schema is dropped and recreated")
+    parser.add_argument("--base-url", help="run HTTP benchmarks against this server")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--rooms", type=int, default=20, help="rooms to spread joins over")
+    parser.add_argument("--room-sizes", type=int, nargs="*", default=[2, 10, 100, 1000])
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--connections", type=int, default=10_000)
+    parser.add_argument("--tokens", type=int, default=100_000)
+    parser.add_argument("--out", help="also write the report to this file")
+    parser.add_argument("--baseline", help="earlier report to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.10)
+    args = parser.parse_args()
+
+    # Must be set before app modules read their settings. Overrides any
+    # WWI_DATABASE__URL already in the environment: the schema is dropped.
+    os.environ["WWI_DATABASE__URL"] = args.database_url
+    # Benchmarks measure request handling, not background maintenance
+    os.environ.setdefault("WWI_REAPER__ENABLED", "false")
+    # Every benchmark request comes from one client address
+    os.environ.setdefault("WWI_RATE_LIMIT__ENABLED", "false")
+    # Fan-out sockets never read; keep the slow-consumer policy out of the way
+    os.environ.setdefault("WWI_WEBSOCKET__SEND_QUEUE_SIZE", str(max(1_000_000, args.messages)))
+    os.environ.setdefault("WWI_WEBSOCKET__SEND_QUEUE_HIGH_WATER_BYTES", str(1 << 40))
+
+    report = asyncio.run(run(args))
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            report["regressions"] = compare(report, json.load(f), args.tolerance)
+
+    output = json.dumps(report, indent=2)
+    print(output)
+
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(output + "\n")
+
+    if report.get("regressions"):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Join-token store memory benchmark.
+
+Issues N outstanding tokens spread over a set of rooms and reports the
+traced heap growth per token as JSON.
+
+    python -m benchmarks.token_memory --tokens 1000000
+"""
+import argparse
+import gc
+import json
+import tracemalloc
+import uuid
+
+from app.services import join_token_service
+
+
+def measure(tokens: int, rooms: int) -> dict:
+    room_ids = [uuid.uuid4() for _ in range(rooms)]
+
+    join_token_service._join_token_storage.clear()
+    join_token_service._join_token_expiry.clear()
+    gc.collect()
+
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+
+    for i in range(tokens):
+        join_token_service.generate_join_token(room_ids[i % rooms])
+
+    after, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "benchmark": "token_memory",
+        "tokens": tokens,
+        "rooms": rooms,
+        "store_size": join_token_service.token_count(),
+        "bytes_total": after - before,
+        "bytes_per_token": round((after - before) / tokens, 1),
+        "peak_bytes": peak - before,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tokens", type=int, default=1_000_000)
+    parser.add_argument("--rooms", type=int, default=1_000)
+    args = parser.parse_args()
+
+    print(json.dumps(measure(args.tokens, args.rooms)))
+
+
+if __name__ == "__main__":
+    main()
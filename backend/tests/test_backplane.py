@@ -0,0 +1,255 @@
+import asyncio
+import uuid
+
+import pytest
+
+from app.core.config import BackplaneSettings
+from app.state.backplane import (
+    InMemoryBackplane,
+    RedisBackplane,
+    create_backplane,
+    encode_batch,
+)
+
+SETTINGS = BackplaneSettings(batch_interval_ms=0)
+
+
+async def _wait_for(predicate, timeout: float = 2.0) -> None:
+    async with asyncio.timeout(timeout):
+        while not predicate():
+            await asyncio.sleep(0.01)
+
+
+def test_memory_backend_has_no_backplane():
+    assert create_backplane(BackplaneSettings(backend="memory")) is None
+
+
+async def test_publish_skipped_without_peers():
+    hub = {}
+    node = InMemoryBackplane(SETTINGS, hub)
+    await node.start(lambda room_id, message: None)
+    room_id = uuid.uuid4()
+
+    node.watch(room_id)
+    await _wait_for(lambda: hub)
+    node.publish(room_id, b"frame")
+
+    assert node._pending == {}
+    await node.stop()
+
+
+async def test_own_envelopes_dropped_before_decoding():
+    node = InMemoryBackplane(SETTINGS, {})
+    delivered = []
+    await node.start(lambda room_id, message: delivered.append(message))
+    room_id = uuid.uuid4()
+    node.watch(room_id)
+
+    # A truncated item would fail to decode; it must not get that far
+    node._receive(room_id, node.node_id + b"\x01\x00")
+
+    assert delivered == []
+    await node.stop()
+
+
+async def test_redis_relays_between_nodes(monkeypatch):
+    fakeredis = pytest.importorskip("fakeredis")
+    from redis import asyncio as aioredis
+
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(
+        aioredis, "from_url", lambda url: fakeredis.FakeAsyncRedis(server=server))
+
+    room_id = uuid.uuid4()
+    received: dict[str, list] = {"a": [], "b": []}
+
+    a = RedisBackplane(SETTINGS)
+    b = RedisBackplane(SETTINGS)
+    await a.start(lambda r, message: received["a"].append((r, message)))
+    await b.start(lambda r, message: received["b"].append((r, message)))
+
+    a.watch(room_id)
+    b.watch(room_id)
+    await _wait_for(lambda: a._channels and b._channels)
+
+    a.publish(room_id, b"\x01binary")
+    a.publish(room_id, "text")
+
+    await _wait_for(lambda: len(received["b"]) == 2)
+    assert received["b"] == [(room_id, b"\x01binary"), (room_id, "text")]
+
+    # A node never gets its own envelopes back
+    await asyncio.sleep(0.1)
+    assert received["a"] == []
+
+    await a.stop()
+    await b.stop()
+
+
+def test_encode_batch_starts_with_node_id():
+    node_id = uuid.uuid4().bytes
+    assert encode_batch(node_id, [b"x"]).startswith(node_id)
+
+
+async def test_rooms_closed_reaches_other_nodes():
+    hub = {}
+    closed: dict[str, list] = {"a": [], "b": []}
+
+    a = InMemoryBackplane(SETTINGS, hub)
+    b = InMemoryBackplane(SETTINGS, hub)
+    await a.start(lambda r, m: None, closed["a"].extend)
+    await b.start(lambda r, m: None, closed["b"].extend)
+    # The control channel is subscribed without watching any room
+    await _wait_for(lambda: len(hub.get(f"{SETTINGS.channel_prefix}control", ())) == 2)
+
+    rooms = [(uuid.uuid4(), "ABC123"), (uuid.uuid4(), "XYZ7890")]
+    await a.announce_rooms_closed(rooms)
+
+    assert closed == {"a": [], "b": rooms}
+    await a.stop()
+    await b.stop()
+
+
+async def test_redis_rooms_closed_reaches_other_nodes(monkeypatch):
+    fakeredis = pytest.importorskip("fakeredis")
+    from redis import asyncio as aioredis
+
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(
+        aioredis, "from_url", lambda url: fakeredis.FakeAsyncRedis(server=server))
+
+    closed = []
+    a = RedisBackplane(SETTINGS)
+    b = RedisBackplane(SETTINGS)
+    await a.start(lambda r, m: None)
+    await b.start(lambda r, m: None, closed.extend)
+    await _wait_for(lambda: a._channels and b._channels)
+
+    rooms = [(uuid.uuid4(), "ABC123")]
+    await a.announce_rooms_closed(rooms)
+
+    await _wait_for(lambda: closed)
+    assert closed == rooms
+    await a.stop()
+    await b.stop()
+
+
+async def test_nodes_lease_disjoint_slot_ranges():
+    hub = {}
+    a = InMemoryBackplane(SETTINGS, hub)
+    b = InMemoryBackplane(SETTINGS, hub)
+    await a.start(lambda r, m: None)
+    await b.start(lambda r, m: None)
+
+    assert {a.node_index, b.node_index} == {0, 1}
+    assert a.slot_range[1] < b.slot_range[0]
+
+    # A stopped node's index is free for the next one
+    await a.stop()
+    c = InMemoryBackplane(SETTINGS, hub)
+    await c.start(lambda r, m: None)
+    assert c.node_index == 0
+    await b.stop()
+    await c.stop()
+
+
+@pytest.fixture
+def app_settings(monkeypatch):
+    from app.core.config import get_settings
+
+    monkeypatch.setenv("WWI_DATABASE__URL", "sqlite+aiosqlite://")
+    monkeypatch.setenv("WWI_WEBSOCKET__PRESENCE_BATCH_MS", "0")
+    monkeypatch.setenv("WWI_WEBSOCKET__COALESCE_WINDOW_MS", "0")
+    get_settings.cache_clear()
+    yield
+    get_settings.cache_clear()
+
+
+class _Socket:
+    def __init__(self) -> None:
+        self.sent = []
+
+    async def send(self, message) -> None:
+        self.sent.append(message)
+
+
+async def _start_node(hub):
+    from app.state.connections import ConnectionRegistry
+
+    registry = ConnectionRegistry()
+    backplane = InMemoryBackplane(SETTINGS, hub)
+    await backplane.start(registry.deliver_remote, None, registry.publish_rosters)
+    registry.attach_backplane(backplane)
+    return registry, backplane
+
+
+async def test_registry_assigns_slots_from_leased_range(app_settings):
+    from app.state.connections import ConnectionRegistry
+
+    hub = {}
+    first = InMemoryBackplane(SETTINGS, hub)
+    node = InMemoryBackplane(SETTINGS, hub)
+    await first.start(lambda r, m: None)
+    await node.start(lambda r, m: None)
+
+    registry = ConnectionRegistry()
+    registry.attach_backplane(node)
+    websocket = object()
+    connection = registry.register(websocket, uuid.uuid4())
+
+    assert connection.slot == node.slot_range[0] > 1
+    registry.disconnect(websocket)
+    await first.stop()
+    await node.stop()
+
+
+async def test_redis_nodes_lease_distinct_indexes(monkeypatch):
+    fakeredis = pytest.importorskip("fakeredis")
+    from redis import asyncio as aioredis
+
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(
+        aioredis, "from_url", lambda url: fakeredis.FakeAsyncRedis(server=server))
+
+    settings = BackplaneSettings(batch_interval_ms=0, max_nodes=2)
+    a = RedisBackplane(settings)
+    b = RedisBackplane(settings)
+    await a.start(lambda r, m: None)
+    await b.start(lambda r, m: None)
+    assert {a.node_index, b.node_index} == {0, 1}
+
+    extra = RedisBackplane(settings)
+    with pytest.raises(RuntimeError):
+        await extra.start(lambda r, m: None)
+    await extra.stop()
+
+    # Released on stop
+    await a.stop()
+    c = RedisBackplane(settings)
+    await c.start(lambda r, m: None)
+    assert c.node_index == a.node_index
+    await b.stop()
+    await c.stop()
+
+
+async def test_presence_relayed_between_nodes(app_settings):
+    hub = {}
+    room_id = uuid.uuid4()
+    (a, a_plane), (b, b_plane) = await _start_node(hub), await _start_node(hub)
+
+    alice = a.register(_Socket(), room_id, "alice")
+    await asyncio.sleep(0.05)
+    # b joins later and catches up through a roster request
+    bob = b.register(_Socket(), room_id, "bob")
+    await _wait_for(lambda: len(b.roster(room_id)) == 2)
+    await _wait_for(lambda: len(a.roster(room_id)) == 2)
+
+    a.rename(alice, "alicia")
+    await _wait_for(lambda: b.roster(room_id).get(alice.slot) == "alicia")
+
+    a.disconnect(alice.websocket)
+    await _wait_for(lambda: b.roster(room_id) == {bob.slot: "bob"})
+
+    b.disconnect(bob.websocket)
+    await a_plane.stop()
+    await b_plane.stop()
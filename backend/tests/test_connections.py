@@ -0,0 +1,133 @@
+import asyncio
+import uuid
+
+import pytest
+
+from app.core.config import WebSocketSettings
+from app.state.connections import Connection
+
+
+class _Socket:
+    """
+    Records what the writer sends; holds every send until released, so
+    frames pile up in the connection's queue as behind a slow client.
+    """
+
+    def __init__(self) -> None:
+        self.sent = []
+        self.released = asyncio.Event()
+
+    async def send(self, message) -> None:
+        await self.released.wait()
+        self.sent.append(message)
+
+
+@pytest.fixture
+def connect():
+    connections = []
+
+    def connect(policy: str, frames: int = 4, max_bytes: int = 1024) -> tuple[Connection, _Socket]:
+        settings = WebSocketSettings(
+            send_queue_size=frames,
+            send_queue_high_water_bytes=max_bytes,
+            slow_consumer_policy=policy,
+        )
+        socket = _Socket()
+        connection = Connection(socket, uuid.uuid4(), 1, settings)
+        connections.append(connection)
+        return connection, socket
+
+    yield connect
+    for connection in connections:
+        connection.close()
+
+
+def _binary(data: bytes) -> tuple[dict, int]:
+    return {"type": "websocket.send", "bytes": data}, len(data)
+
+
+def _text(data: str) -> tuple[dict, int]:
+    return {"type": "websocket.send", "text": data}, len(data)
+
+
+def _adjacent_binary(connection: Connection) -> int:
+    """
+    What _mergeable should be: queued binary frames right behind another.
+    """
+    queued = [message for message, _ in connection._buffer]
+    return sum(
+        "bytes" in earlier and "bytes" in later
+        for earlier, later in zip(queued, queued[1:])
+    )
+
+
+async def _drain(connection: Connection, socket: _Socket) -> list:
+    socket.released.set()
+    assert await connection.flush(1)
+    return [message.get("bytes", message.get("text")) for message in socket.sent]
+
+
+async def test_disconnect_evicts_past_the_frame_limit(connect):
+    connection, _ = connect("disconnect", frames=3)
+
+    assert all(connection.enqueue(*_binary(b"x")) for _ in range(3))
+    assert connection.queue_depth == 3
+    assert not connection.enqueue(*_binary(b"x"))
+
+
+async def test_disconnect_evicts_past_the_byte_limit(connect):
+    connection, _ = connect("disconnect", max_bytes=10)
+
+    assert connection.enqueue(*_binary(b"x" * 10))
+    assert not connection.enqueue(*_binary(b"x"))
+    assert connection.queued_bytes == 11
+
+
+async def test_drop_oldest_keeps_the_newest_frames(connect):
+    connection, socket = connect("drop_oldest", frames=3)
+
+    assert all(connection.enqueue(*_binary(bytes([i]))) for i in range(5))
+    assert connection.queue_depth == 3
+    assert connection.dropped == 2
+    assert await _drain(connection, socket) == [b"\x02", b"\x03", b"\x04"]
+
+
+async def test_drop_oldest_keeps_mergeable_count(connect):
+    connection, _ = connect("drop_oldest", frames=4)
+
+    for message in (_binary(b"a"), _binary(b"b"), _binary(b"c"), _text("t"), _binary(b"d")):
+        assert connection.enqueue(*message)
+
+    assert connection.queue_depth == 4
+    assert connection._mergeable == _adjacent_binary(connection) == 1
+
+
+async def test_coalesce_merges_binary_runs(connect):
+    connection, socket = connect("coalesce", frames=4)
+
+    for message in (_binary(b"a"), _binary(b"b"), _binary(b"c")):
+        assert connection.enqueue(*message)
+    assert connection._mergeable == _adjacent_binary(connection) == 2
+
+    assert connection.enqueue(*_text("t"))
+    assert connection.enqueue(*_binary(b"d"))
+
+    # Over the limit: a, b, c go out as one send, ahead of the text frame
+    assert connection.queue_depth == 3
+    assert connection._mergeable == _adjacent_binary(connection) == 0
+    assert connection.dropped == 0
+    assert await _drain(connection, socket) == [b"abc", "t", b"d"]
+
+
+async def test_coalesce_evicts_when_merging_cannot_help(connect):
+    connection, _ = connect("coalesce", frames=4)
+
+    assert all(connection.enqueue(*_text("t")) for _ in range(4))
+    assert not connection.enqueue(*_text("t"))
+
+
+async def test_coalesce_evicts_past_the_byte_limit(connect):
+    connection, _ = connect("coalesce", max_bytes=10)
+
+    assert connection.enqueue(*_binary(b"x" * 6))
+    assert not connection.enqueue(*_binary(b"x" * 6))
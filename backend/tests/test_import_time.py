@@ -0,0 +1,47 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND = Path(__file__).resolve().parents[1]
+
+# Loaded on first use, never by importing the app (as in benchmarks.import_time)
+LAZY_MODULES = ["sqlalchemy", "asyncpg", "argon2", "redis", "app.schema"]
+
+# Same budget and override as `python -m benchmarks.import_time`
+BUDGET_MS = float(os.environ.get("WWI_IMPORT_BUDGET_MS", 400))
+
+_CHILD = (
+    "import json, sys, time\n"
+    "start = time.perf_counter()\n"
+    "import app.main\n"
+    "app.main.create_app()\n"
+    "elapsed = time.perf_counter() - start\n"
+    f"print(json.dumps({{'ms': elapsed * 1000, 'loaded': [m for m in {LAZY_MODULES!r} if m in sys.modules]}}))\n"
+)
+
+
+def _import_app() -> dict:
+    env = dict(os.environ)
+    env.setdefault("WWI_DATABASE__URL", "postgresql+asyncpg://test@localhost/test")
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(BACKEND), env.get("PYTHONPATH")]))
+
+    result = subprocess.run(
+        [sys.executable, "-c", _CHILD],
+        cwd=BACKEND, env=env, capture_output=True, text=True, check=True,
+    )
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+def test_importing_app_leaves_heavy_modules_unloaded():
+    assert _import_app()["loaded"] == []
+
+
+def test_importing_app_stays_within_budget():
+    # First run compiles bytecode after a checkout; not counted
+    _import_app()
+    median = statistics.median(_import_app()["ms"] for _ in range(3))
+
+    assert median <= BUDGET_MS, f"import app.main + create_app() took {median:.0f} ms"
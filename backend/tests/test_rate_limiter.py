@@ -0,0 +1,27 @@
+from app.state.rate_limiter import TokenBucketLimiter
+
+
+def _limiter(burst: int = 3) -> TokenBucketLimiter:
+    return TokenBucketLimiter(rate=0.001, burst=burst, shards=1, max_keys=10)
+
+
+def test_tokens_held_by_concurrent_attempts_are_counted():
+    limiter = _limiter()
+
+    assert [limiter.take("room") for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert limiter.take("room") > 0
+
+
+def test_refund_returns_a_token_but_never_past_the_burst():
+    limiter = _limiter()
+
+    for _ in range(3):
+        limiter.take("room")
+    assert limiter.take("room", -1) == 0.0
+    assert limiter.take("room") == 0.0
+    assert limiter.take("room") > 0
+
+    # A full bucket stays at the burst
+    limiter.take("other", -5)
+    assert [limiter.take("other") for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert limiter.take("other") > 0
@@ -0,0 +1,140 @@
+import asyncio
+import uuid
+
+import pytest
+
+from app.core.config import ReplaySettings
+from app.core.protocol import (
+    HEADER_SIZE,
+    SEQUENCE,
+    FrameType,
+    encode_frame,
+    parse_header,
+)
+from app.state import replay
+from app.state.replay import ReplayRing
+
+SETTINGS = ReplaySettings(enabled=True, max_messages=2, max_age_seconds=10)
+
+
+def _append(ring: ReplayRing, now: float = 0.0) -> int:
+    frame = encode_frame(FrameType.MESSAGE, 1, uuid.uuid4(), b"x")
+    seq, _ = ring.append(frame, now, SETTINGS)
+    return seq
+
+
+def _seqs(frames: list[bytes]) -> list[int]:
+    return [SEQUENCE.unpack_from(frame, HEADER_SIZE)[0] for frame in frames]
+
+
+def test_since_resumes_after_the_cursor():
+    ring = ReplayRing()
+    first, second = _append(ring), _append(ring)
+
+    complete, frames = ring.since(first)
+    assert complete and _seqs(frames) == [second]
+    assert ring.since(second) == (True, [])
+
+
+def test_cursor_from_another_epoch_is_a_gap_with_nothing_replayed():
+    ring = ReplayRing()
+    seq = _append(ring)
+
+    assert ring.since(seq ^ (1 << 32)) == (False, [])
+
+
+def test_cursor_older_than_the_ring_replays_everything_held():
+    ring = ReplayRing()
+    seqs = [_append(ring) for _ in range(4)]
+
+    complete, frames = ring.since(seqs[0])
+    assert not complete
+    assert _seqs(frames) == seqs[2:]
+
+
+def test_frames_expire_after_max_age():
+    ring = ReplayRing()
+    first = _append(ring, now=0.0)
+    second = _append(ring, now=5.0)
+
+    ring.expire(11.0, SETTINGS.max_age_seconds)
+    complete, frames = ring.since(first)
+    assert complete and _seqs(frames) == [second]
+
+    ring.expire(16.0, SETTINGS.max_age_seconds)
+    assert ring.since(first) == (False, [])
+
+
+def test_counter_wrap_starts_a_new_epoch(monkeypatch):
+    epochs = iter([7, 8])
+    monkeypatch.setattr(replay.secrets, "randbits", lambda bits: next(epochs))
+    ring = ReplayRing()
+    ring.next_seq = (7 << 32) + 2**32 - 2
+
+    before = _append(ring)
+    after = _append(ring)
+
+    assert after == 8 << 32
+    assert ring.first_seq == after
+    assert ring.since(before) == (False, [])
+    assert ring.since(after) == (True, [])
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    from app.core.config import get_settings
+    from app.state.connections import ConnectionRegistry
+
+    monkeypatch.setenv("WWI_DATABASE__URL", "sqlite+aiosqlite://")
+    monkeypatch.setenv("WWI_WEBSOCKET__PRESENCE_BATCH_MS", "0")
+    monkeypatch.setenv("WWI_WEBSOCKET__REPLAY__ENABLED", "true")
+    monkeypatch.setattr(replay, "_store", None)
+    get_settings.cache_clear()
+    yield ConnectionRegistry()
+    get_settings.cache_clear()
+
+
+class _Socket:
+    def __init__(self) -> None:
+        self.sent = []
+
+    async def send(self, message) -> None:
+        self.sent.append(message)
+
+
+@pytest.mark.parametrize("others_stay", [True, False])
+async def test_rejoining_member_never_gets_a_slot_still_in_replay(registry, others_stay):
+    room_id = uuid.uuid4()
+    if others_stay:
+        registry.register(_Socket(), room_id, "carol")
+    alice_ws, bob_ws = _Socket(), _Socket()
+    alice = registry.register(alice_ws, room_id, "alice")
+    registry.register(bob_ws, room_id, "bob")
+
+    registry.disconnect(bob_ws)
+    for text in (b"hi bob", b"while you were away"):
+        registry.broadcast(room_id, encode_frame(FrameType.MESSAGE, alice.slot, room_id, text))
+    await asyncio.sleep(0)
+    (seq,) = SEQUENCE.unpack_from(alice_ws.sent[0]["bytes"], HEADER_SIZE)
+    registry.disconnect(alice_ws)
+
+    bob_ws = _Socket()
+    bob = registry.register(bob_ws, room_id, "bob")
+    assert bob.slot != alice.slot
+
+    assert registry.replay(bob, seq) == 1
+    await asyncio.sleep(0)
+    replayed = [parse_header(m["bytes"]) for m in bob_ws.sent if m["bytes"][0] == FrameType.MESSAGE]
+    assert [h.sender_slot for h in replayed] == [alice.slot]
+
+
+async def test_closing_a_room_drops_its_replay_ring(registry):
+    room_id = uuid.uuid4()
+    ws = _Socket()
+    connection = registry.register(ws, room_id)
+    registry.broadcast(room_id, encode_frame(FrameType.MESSAGE, connection.slot, room_id, b"x"))
+
+    store = replay.get_replay_store()
+    assert store.room_count() == 1
+    registry.close_room(room_id)
+    assert store.room_count() == 0 and store.bytes == 0
@@ -0,0 +1,203 @@
+// Binary WebSocket envelope, mirrored from backend/app/core/protocol.py.
+//
+// Header (24 bytes, big-endian):
+//   type u8 | flags u8 | senderSlot u16 | roomId 16 bytes | length u32
+// followed by `length` bytes of payload.
+
+export const HEADER_SIZE = 24
+
+export const FrameType = {
+  // Batches (coalescing, replay) may include this client's own messages;
+  // skip those whose senderSlot is the one from Welcome
+  Message: 1,
+  Welcome: 2,
+  // Server -> client: about to restart; payload is an ASCII resume token
+  // for /ws?resume=, or empty (rejoin with the room password)
+  Reconnect: 3,
+  // Client -> server: UTF-8 display name
+  Rename: 4,
+  // Server -> client: {"members": {"<slot>": "<name>"}} once after joining
+  Roster: 5,
+  // Server -> client: {"joined": {...}, "renamed": {...}, "left": [slots]};
+  // apply "left" before "joined" (a slot may be reused within one batch)
+  Presence: 6,
+  // Server -> client: frames after /ws?since= are gone; payload u64 is the
+  // oldest sequence still held (0 if none). Held frames follow, unless
+  // since came from another server's (or an evicted) ring: then none do.
+  HistoryGap: 7,
+} as const
+
+// Flag bits (see backend/app/core/protocol.py)
+export const FLAG_DEFLATE = 0x01
+export const FLAG_DEFLATE_STREAM = 0x02
+// Payload starts with a u64 room sequence number (always < 2**53, so a
+// plain number is exact); DEFLATE flags apply to the rest. Pass the last
+// one seen as /ws?since= when reconnecting.
+export const FLAG_SEQ = 0x04
+
+export interface FrameHeader {
+  type: number
+  flags: number
+  senderSlot: number
+  roomId: Uint8Array
+  length: number
+}
+
+export function uuidToBytes(uuid: string): Uint8Array {
+  const hex = uuid.replace(/-/g, '')
+  const bytes = new Uint8Array(16)
+  for (let i = 0; i < 16; i++) {
+    bytes[i] = parseInt(hex.slice(i * 2, i * 2 + 2), 16)
+  }
+  return bytes
+}
+
+export function encodeFrame(
+  type: number,
+  senderSlot: number,
+  roomId: Uint8Array,
+  payload: Uint8Array = new Uint8Array(0),
+): Uint8Array {
+  const frame = new Uint8Array(HEADER_SIZE + payload.length)
+  const view = new DataView(frame.buffer)
+
+  view.setUint8(0, type)
+  view.setUint8(1, 0)
+  view.setUint16(2, senderSlot)
+  frame.set(roomId, 4)
+  view.setUint32(20, payload.length)
+  frame.set(payload, HEADER_SIZE)
+
+  return frame
+}
+
+export function decodeFrame(
+  data: ArrayBuffer,
+  offset = 0,
+): { header: FrameHeader; payload: Uint8Array } {
+  const view = new DataView(data, offset)
+  const header: FrameHeader = {
+    type: view.getUint8(0),
+    flags: view.getUint8(1),
+    senderSlot: view.getUint16(2),
+    roomId: new Uint8Array(data, offset + 4, 16),
+    length: view.getUint32(20),
+  }
+
+  return {
+    header,
+    payload: new Uint8Array(data, offset + HEADER_SIZE, header.length),
+  }
+}
+
+// One WebSocket message may carry several envelopes back to back (the
+// server coalesces room traffic); envelopes are self-delimiting.
+export function* decodeFrames(
+  data: ArrayBuffer,
+): Generator<{ header: FrameHeader; payload: Uint8Array }> {
+  let offset = 0
+  while (offset + HEADER_SIZE <= data.byteLength) {
+    const frame = decodeFrame(data, offset)
+    yield frame
+    offset += HEADER_SIZE + frame.header.length
+  }
+}
+
+// Inflate a FLAG_DEFLATE payload (raw DEFLATE, independent per frame).
+export async function inflatePayload(payload: Uint8Array): Promise<Uint8Array> {
+  const stream = new Blob([payload])
+    .stream()
+    .pipeThrough(new DecompressionStream('deflate-raw'))
+  return new Uint8Array(await new Response(stream).arrayBuffer())
+}
+
+const SYNC_TAIL = new Uint8Array([0x00, 0x00, 0xff, 0xff])
+
+const nextTask = () => new Promise((resolve) => setTimeout(resolve, 0))
+
+// Inflates FLAG_DEFLATE_STREAM payloads: one DEFLATE stream for the whole
+// connection, each payload sync-flushed with its 00 00 ff ff tail removed.
+// Use one instance per socket and inflate payloads in arrival order.
+export class StreamInflater {
+  private writer: WritableStreamDefaultWriter<BufferSource>
+  private output: Uint8Array[] = []
+  private arrived: (() => void) | null = null
+
+  constructor() {
+    const stream = new DecompressionStream('deflate-raw')
+    this.writer = stream.writable.getWriter()
+    void this.collect(stream.readable.getReader())
+  }
+
+  private async collect(reader: ReadableStreamDefaultReader<Uint8Array>) {
+    for (;;) {
+      const { done, value } = await reader.read()
+      if (done) return
+      this.output.push(value)
+      this.arrived?.()
+      this.arrived = null
+    }
+  }
+
+  async inflate(payload: Uint8Array): Promise<Uint8Array> {
+    const input = new Uint8Array(payload.length + SYNC_TAIL.length)
+    input.set(payload)
+    input.set(SYNC_TAIL, payload.length)
+
+    await this.writer.write(input)
+    // Output can trail the write (some runtimes inflate off-thread). A
+    // payload always inflates to at least one byte, and the sync flush
+    // releases all of it together: wait for the first chunk, then until a
+    // task turn passes without more.
+    if (!this.output.length) {
+      await new Promise<void>((resolve) => {
+        this.arrived = resolve
+      })
+    }
+    let count
+    do {
+      count = this.output.length
+      await nextTask()
+    } while (this.output.length !== count)
+
+    const chunks = this.output
+    this.output = []
+    const result = new Uint8Array(chunks.reduce((n, c) => n + c.length, 0))
+    let offset = 0
+    for (const chunk of chunks) {
+      result.set(chunk, offset)
+      offset += chunk.length
+    }
+    return result
+  }
+
+  close() {
+    this.writer.abort().catch(() => {})
+  }
+}
+
+// Sequence number (FLAG_SEQ) and the decoded payload of one envelope.
+// Stream-deflated payloads need the socket's StreamInflater.
+export async function readPayload(
+  header: FrameHeader,
+  payload: Uint8Array,
+  inflater?: StreamInflater,
+): Promise<{ seq: number | null; body: Uint8Array }> {
+  let seq: number | null = null
+  let body = payload
+
+  if (header.flags & FLAG_SEQ) {
+    const view = new DataView(payload.buffer, payload.byteOffset, 8)
+    seq = Number(view.getBigUint64(0))
+    body = payload.subarray(8)
+  }
+
+  if (header.flags & FLAG_DEFLATE) {
+    body = await inflatePayload(body)
+  } else if (header.flags & FLAG_DEFLATE_STREAM) {
+    if (!inflater) throw new Error('stream-deflated frame without an inflater')
+    body = await inflater.inflate(body)
+  }
+
+  return { seq, body }
+}